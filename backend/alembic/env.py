@@ -0,0 +1,52 @@
+"""Alembic environment: migrates the database configured by DATABASE_URL."""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.db.database import Base, engine
+# 導入所有模型以便 autogenerate 比對 Base.metadata
+from app.models import cfts_db, sys2_requirement, testcase, search_document, data_version  # noqa: F401
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # search_documents 依資料庫建立（FTS5 / tsvector），不由 autogenerate 管理
+    if type_ == "table" and name.startswith("search_documents"):
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting (alembic upgrade head --sql)."""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,191 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 18:30:44.641184
+
+Databases created before migrations existed (Base.metadata.create_all at
+startup) already have some of these tables; existing tables and indexes
+are skipped, so this revision also adds the keyset pagination indexes
+that create_all never added to existing tables.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+SEARCH_TS_CONFIG = "english"
+
+
+def _inspector():
+    # Offline mode (--sql) cannot inspect; emit every statement
+    return None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+
+def _create_table(name, *columns):
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table(name):
+        op.create_table(name, *columns)
+
+
+def _create_index(name, table, columns, unique=False):
+    inspector = _inspector()
+    if inspector is None or name not in {index["name"] for index in inspector.get_indexes(table)}:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade():
+    _create_table(
+        'cfts_requirements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cfts_id', sa.String(), nullable=True),
+        sa.Column('cfts_name', sa.String(), nullable=True),
+        sa.Column('req_id', sa.String(), nullable=True),
+        sa.Column('source_id', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('sr24_description', sa.String(), nullable=True),
+        sa.Column('melco_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_cfts_requirements_id', 'cfts_requirements', ['id'])
+    _create_index('ix_cfts_requirements_cfts_id', 'cfts_requirements', ['cfts_id'])
+    _create_index('ix_cfts_requirements_req_id', 'cfts_requirements', ['req_id'])
+    _create_index('ix_cfts_requirements_source_id', 'cfts_requirements', ['source_id'])
+    _create_index('ix_cfts_requirements_cfts_id_req_id_id', 'cfts_requirements', ['cfts_id', 'req_id', 'id'])
+    _create_index('ix_cfts_requirements_req_id_id', 'cfts_requirements', ['req_id', 'id'])
+
+    _create_table(
+        'cfts_melco_links',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cfts_requirement_id', sa.Integer(), nullable=False),
+        sa.Column('melco_id', sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(['cfts_requirement_id'], ['cfts_requirements.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('melco_id', 'cfts_requirement_id', name='uq_cfts_melco_links_melco_id_req'),
+    )
+    _create_index('ix_cfts_melco_links_cfts_requirement_id', 'cfts_melco_links', ['cfts_requirement_id'])
+
+    _create_table(
+        'cfts_catalog',
+        sa.Column('cfts_id', sa.String(), nullable=False),
+        sa.Column('cfts_name', sa.String(), nullable=True),
+        sa.Column('source_file', sa.String(), nullable=True),
+        sa.Column('requirement_count', sa.Integer(), nullable=False),
+        sa.Column('sys2_count', sa.Integer(), nullable=False),
+        sa.Column('testcase_count', sa.Integer(), nullable=False),
+        sa.Column('last_imported_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('cfts_id'),
+    )
+
+    _create_table(
+        'sys2_requirements',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('melco_id', sa.String(), nullable=True),
+        sa.Column('cfts_id', sa.String(), nullable=True),
+        sa.Column('cfts_name', sa.String(), nullable=True),
+        sa.Column('requirement_en', sa.Text(), nullable=True),
+        sa.Column('reason_en', sa.Text(), nullable=True),
+        sa.Column('supplement_en', sa.Text(), nullable=True),
+        sa.Column('confirmation_phase', sa.String(), nullable=True),
+        sa.Column('verification_criteria', sa.Text(), nullable=True),
+        sa.Column('type', sa.String(), nullable=True),
+        sa.Column('related_requirement_ids', sa.Text(), nullable=True),
+        sa.Column('r1l_sr21cfts', sa.String(), nullable=True),
+        sa.Column('r1l_sr22cfts', sa.String(), nullable=True),
+        sa.Column('r1l_sr23cfts', sa.String(), nullable=True),
+        sa.Column('r1l_sr24cfts', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_sys2_requirements_id', 'sys2_requirements', ['id'])
+    _create_index('ix_sys2_requirements_melco_id', 'sys2_requirements', ['melco_id'], unique=True)
+    _create_index('ix_sys2_requirements_cfts_id', 'sys2_requirements', ['cfts_id'])
+    _create_index('ix_sys2_requirements_cfts_id_melco_id_id', 'sys2_requirements', ['cfts_id', 'melco_id', 'id'])
+    _create_index('ix_sys2_requirements_cfts_id_id', 'sys2_requirements', ['cfts_id', 'id'])
+
+    _create_table(
+        'testcases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('feature_id', sa.String(), nullable=True),
+        sa.Column('source', sa.String(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('section', sa.String(), nullable=True),
+        sa.Column('test_item_en', sa.Text(), nullable=True),
+        sa.Column('precondition_procedure_jp', sa.Text(), nullable=True),
+        sa.Column('criteria_jp', sa.Text(), nullable=True),
+        sa.Column('mp', sa.String(), nullable=True),
+        sa.Column('ds', sa.String(), nullable=True),
+        sa.Column('dt', sa.String(), nullable=True),
+        sa.Column('hdcc', sa.String(), nullable=True),
+        sa.Column('ru', sa.String(), nullable=True),
+        sa.Column('specification', sa.String(), nullable=True),
+        sa.Column('priority', sa.String(), nullable=True),
+        sa.Column('test_version', sa.String(), nullable=True),
+        sa.Column('test_result', sa.String(), nullable=True),
+        sa.Column('tester', sa.String(), nullable=True),
+        sa.Column('issue_id', sa.String(), nullable=True),
+        sa.Column('note', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    _create_index('ix_testcases_id', 'testcases', ['id'])
+    _create_index('ix_testcases_feature_id', 'testcases', ['feature_id'])
+    _create_index('ix_testcases_feature_id_id', 'testcases', ['feature_id', 'id'])
+
+    _create_table(
+        'data_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    _create_table(
+        'ngram_postings',
+        sa.Column('gram', sa.String(), nullable=False),
+        sa.Column('doc_type', sa.String(), nullable=False),
+        sa.Column('doc_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('gram', 'doc_type', 'doc_id'),
+    )
+
+    # 全文檢索索引表（見 app/models/search_document.py）
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(f"""
+            CREATE TABLE IF NOT EXISTS search_documents (
+                doc_type VARCHAR NOT NULL,
+                doc_id INTEGER NOT NULL,
+                doc_key VARCHAR,
+                cfts_id VARCHAR,
+                content TEXT,
+                search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('{SEARCH_TS_CONFIG}', coalesce(content, ''))) STORED,
+                PRIMARY KEY (doc_type, doc_id)
+            )
+        """)
+        op.execute("CREATE INDEX IF NOT EXISTS ix_search_documents_vector ON search_documents USING GIN (search_vector)")
+    elif dialect == "sqlite":
+        op.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5(
+                doc_type UNINDEXED, doc_id UNINDEXED, doc_key UNINDEXED, cfts_id UNINDEXED, content,
+                tokenize = 'porter unicode61'
+            )
+        """)
+
+
+def downgrade():
+    op.execute("DROP TABLE IF EXISTS search_documents")
+    op.drop_table('ngram_postings')
+    op.drop_table('data_version')
+    op.drop_table('testcases')
+    op.drop_table('sys2_requirements')
+    op.drop_table('cfts_catalog')
+    op.drop_table('cfts_melco_links')
+    op.drop_table('cfts_requirements')
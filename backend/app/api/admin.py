@@ -0,0 +1,47 @@
+"""Admin / diagnostics API endpoints."""
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import List, Optional
+from ..models.slow_query import SlowQueryEntry
+from ..request_timing import TimedRoute
+from ..profiling import list_profiles, profile_path
+from ..security import admin_enabled, admin_token_ok
+from ..slow_queries import clear_slow_queries, get_slow_queries
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject the request unless it carries the configured admin token (404 while none is configured)."""
+    if not admin_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_token_ok(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute, dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries", response_model=List[SlowQueryEntry])
+def list_slow_queries():
+    """Slowest recorded statements with parameters and plan of their worst run."""
+    return get_slow_queries()
+
+
+@router.delete("/slow-queries", status_code=204)
+def reset_slow_queries():
+    """Clear the slow query log."""
+    clear_slow_queries()
+
+
+@router.get("/profiles", response_model=List[str])
+def get_profiles():
+    """IDs of stored request profiles (taken with the X-Profile: 1 header), newest first."""
+    return list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """Download a request profile in collapsed-stack format (flamegraph.pl / speedscope)."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=path.name)
@@ -0,0 +1,73 @@
+"""Bulk export API endpoints."""
+import asyncio
+import os
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from ..db.database import get_read_db
+from ..db.data_version import get_data_version
+from ..db.export import EXPORT_MEDIA_TYPES, stream_export
+from ..export_cache import open_sys2_workbook, sys2_export_key
+from ..request_timing import TimedRoute
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+router = APIRouter(prefix="/export", tags=["export"], route_class=TimedRoute)
+
+
+# Declared before /{table} so "sys2.xlsx" is not taken for a table name
+@router.get("/sys2.xlsx")
+async def export_sys2_workbook(
+    cfts_id: Optional[List[str]] = Query(None, description="Restrict to these CFTS IDs (repeatable)"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Download the merged SYS.2 workbook (same layout as export_sys2_merged.py).
+
+    The workbook is built once per data version and filter set on a
+    background worker and served from the disk cache until the next import.
+    """
+    version = get_data_version(db)
+    etag = f'"{sys2_export_key(version, cfts_id)}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    built_version, workbook = await asyncio.to_thread(open_sys2_workbook, version, cfts_id)
+    headers["ETag"] = f'"{sys2_export_key(built_version, cfts_id)}"'
+    headers["Content-Length"] = str(os.fstat(workbook.fileno()).st_size)
+    headers["Content-Disposition"] = 'attachment; filename="R1L_SYS2_ALL_MERGED.xlsx"'
+    return StreamingResponse(_file_chunks(workbook), media_type=XLSX_MEDIA_TYPE, headers=headers)
+
+
+def _file_chunks(f, chunk_size: int = 64 * 1024):
+    """Stream an open file and close it (the file may be unlinked meanwhile)."""
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+@router.get("/{table}")
+def export_table(
+    table: Literal["cfts", "sys2", "testcases"],
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    cfts_id: Optional[List[str]] = Query(None, description="Restrict to these CFTS IDs (repeatable)"),
+):
+    """
+    Stream a whole table as NDJSON or CSV.
+
+    Rows are read through a server-side cursor and written out batch by batch,
+    so memory stays constant and the download starts immediately.
+    """
+    return StreamingResponse(
+        stream_export(table, format, cfts_id),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
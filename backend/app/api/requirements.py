@@ -1,17 +1,18 @@
 """CFTS Requirements API endpoints."""
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from sqlalchemy.orm import Session
-from typing import List
-from ..models.requirement import CFTSRequirement, CFTSSearchResult
-from ..db.database import get_db
-from ..db.crud import (
-    get_cfts_requirements_by_cfts_id, 
-    get_requirement_by_req_id,
-    get_all_cfts_requirements
-)
+from typing import Dict, List, Literal, Optional
+from ..models.requirement import CFTSRequirement, CFTSSearchResult, CFTSCatalogEntry
+from ..models.batch import BatchLookupRequest
+from ..db.database import get_read_db, read_session
+from ..db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from ..autocomplete import get_autocomplete_index
+from ..lookups import Lookups, get_lookups
+from ..request_timing import TimedRoute
+from ..db.crud import search_cfts_json, search_req_json
 
-router = APIRouter(prefix="/cfts", tags=["cfts"])
-req_router = APIRouter(prefix="/req", tags=["req"])
+router = APIRouter(prefix="/cfts", tags=["cfts"], route_class=TimedRoute)
+req_router = APIRouter(prefix="/req", tags=["req"], route_class=TimedRoute)
 
 
 def db_requirement_to_pydantic(db_req) -> CFTSRequirement:
@@ -30,12 +31,23 @@ def db_requirement_to_pydantic(db_req) -> CFTSRequirement:
 
 
 @router.get("/search", response_model=CFTSSearchResult)
-async def search_cfts(cfts_id: str = Query(..., description="CFTS ID to search (supports partial matching, e.g., 'CFTS016')"), db: Session = Depends(get_db)):
+async def search_cfts(
+    cfts_id: str = Query(..., description="CFTS ID to search (supports partial matching, e.g., 'CFTS016')"),
+    db_json: bool = Query(False, description="Build the JSON response in the database (json_agg on PostgreSQL)"),
+    lookups: Lookups = Depends(get_lookups)
+):
     """Search requirements by CFTS ID (supports partial matching)."""
     import logging
     logger = logging.getLogger(__name__)
 
-    db_requirements = get_cfts_requirements_by_cfts_id(db, cfts_id)
+    if db_json:
+        with read_session() as db:
+            payload = search_cfts_json(db, cfts_id)
+        if payload is None:
+            raise HTTPException(status_code=404, detail="CFTS not found")
+        return Response(content=payload, media_type="application/json")
+
+    db_requirements = lookups.search_cfts(cfts_id)
 
     if not db_requirements:
         raise HTTPException(status_code=404, detail="CFTS not found")
@@ -59,32 +71,55 @@ async def search_cfts(cfts_id: str = Query(..., description="CFTS ID to search (
     )
 
 
+@router.post("/search/batch", response_model=Dict[str, List[CFTSRequirement]])
+async def search_cfts_batch(request: BatchLookupRequest, lookups: Lookups = Depends(get_lookups)):
+    """Get requirements for many exact CFTS IDs at once, grouped by CFTS ID."""
+    grouped = lookups.cfts_by_cfts_ids(list(dict.fromkeys(request.ids)))
+    return {
+        cfts_id: [db_requirement_to_pydantic(req) for req in reqs]
+        for cfts_id, reqs in grouped.items()
+    }
+
+
 @req_router.get("/search", response_model=CFTSSearchResult)
-async def search_req(req_id: str = Query(..., description="Req.ID to search"), db: Session = Depends(get_db)):
+async def search_req(
+    req_id: str = Query(..., description="Req.ID to search"),
+    db_json: bool = Query(False, description="Build the JSON response in the database (json_agg on PostgreSQL)"),
+    lookups: Lookups = Depends(get_lookups)
+):
     """Search requirement by Req.ID and return full CFTS list."""
-    db_requirement = get_requirement_by_req_id(db, req_id)
+    if db_json:
+        with read_session() as db:
+            payload = search_req_json(db, req_id)
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Requirement not found")
+        return Response(content=payload, media_type="application/json")
 
-    if not db_requirement:
-        raise HTTPException(status_code=404, detail="Requirement not found")
+    search_cfts_id, db_requirements = lookups.search_req(req_id)
 
-    # Get all requirements from the same CFTS
-    cfts_id = db_requirement.cfts_id
-    db_requirements = get_cfts_requirements_by_cfts_id(db, cfts_id)
+    if not db_requirements:
+        raise HTTPException(status_code=404, detail="Requirement not found")
 
     requirements = [db_requirement_to_pydantic(req) for req in db_requirements]
 
     return CFTSSearchResult(
-        cfts_id=cfts_id,
+        cfts_id=search_cfts_id,
         requirements=requirements,
         total_count=len(requirements),
         target_req_id=req_id  # Add target req_id for highlighting
     )
 
 
+@router.get("/catalog", response_model=List[CFTSCatalogEntry])
+async def get_catalog(lookups: Lookups = Depends(get_lookups)):
+    """Get the CFTS catalog (names, source files and requirement/SYS.2/test case counts)."""
+    return lookups.catalog()
+
+
 @router.get("/requirement/{req_id}", response_model=CFTSRequirement)
-async def get_requirement_by_id(req_id: str, db: Session = Depends(get_db)):
+async def get_requirement_by_id(req_id: str, lookups: Lookups = Depends(get_lookups)):
     """Get specific requirement by Req.ID."""
-    db_requirement = get_requirement_by_req_id(db, req_id)
+    db_requirement = lookups.requirement_by_req_id(req_id)
     
     if not db_requirement:
         raise HTTPException(status_code=404, detail="Requirement not found")
@@ -92,46 +127,59 @@ async def get_requirement_by_id(req_id: str, db: Session = Depends(get_db)):
     return db_requirement_to_pydantic(db_requirement)
 
 
+@router.get("/by-melco-id/{melco_id}", response_model=List[CFTSRequirement])
+async def get_requirements_by_melco_id(melco_id: str, lookups: Lookups = Depends(get_lookups)):
+    """Get all CFTS requirements that reference a Melco ID (reverse traceability)."""
+    db_requirements = lookups.cfts_by_melco_id(melco_id)
+    return [db_requirement_to_pydantic(req) for req in db_requirements]
+
+
 @router.get("/", response_model=List[CFTSRequirement])
-async def get_all_requirements(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all CFTS requirements."""
-    db_requirements = get_all_cfts_requirements(db, skip=skip, limit=limit)
+async def get_all_requirements(
+    response: Response,
+    sort: Literal["cfts_id", "req_id", "id"] = Query("cfts_id", description="Sort key (ties broken by id)"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    cursor: Optional[str] = Query(None, description=f"Opaque token from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    lookups: Lookups = Depends(get_lookups)
+):
+    """Get all CFTS requirements (keyset paginated; next page token in the X-Next-Cursor header)."""
+    try:
+        db_requirements, next_cursor = lookups.cfts_page(sort, cursor, limit, descending=(order == "desc"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [db_requirement_to_pydantic(req) for req in db_requirements]
 
 
 @router.get("/autocomplete/cfts-ids")
-async def autocomplete_cfts_ids(db: Session = Depends(get_db)):
+async def autocomplete_cfts_ids(
+    query: str = Query("", description="Optional CFTS ID or name filter"),
+    fuzzy: bool = Query(False, description="Typo-tolerant matching ranked by match quality"),
+    db: Session = Depends(get_read_db)
+):
     """Get unique CFTS IDs with names for autocomplete (format: 'CFTS016 Anti-Theft')."""
-    from sqlalchemy import distinct
-    from ..models.cfts_db import CFTSRequirementDB
+    # Served from the in-process index; the DB is only hit when the data version changes
+    index = get_autocomplete_index(db)
 
-    # Get distinct CFTS ID and name pairs
-    cfts_data = db.query(
-        CFTSRequirementDB.cfts_id,
-        CFTSRequirementDB.cfts_name
-    ).distinct().order_by(CFTSRequirementDB.cfts_id).all()
-
-    # Format as "CFTS016 Anti-Theft"
-    result = []
-    for cfts_id, cfts_name in cfts_data:
-        if cfts_id:
-            if cfts_name:
-                result.append(f"{cfts_id} {cfts_name}")
-            else:
-                result.append(cfts_id)
-
-    return result
+    if not query:
+        return index.cfts_labels
+    if fuzzy:
+        return index.cfts_matcher.search(query)
+    return index.search_cfts_labels(query)
 
 
 @req_router.get("/autocomplete/req-ids")
-async def autocomplete_req_ids(query: str = Query("", min_length=0), db: Session = Depends(get_db)):
+async def autocomplete_req_ids(
+    query: str = Query("", min_length=0),
+    fuzzy: bool = Query(False, description="Typo-tolerant matching ranked by match quality"),
+    db: Session = Depends(get_read_db)
+):
     """Get Req IDs for autocomplete (with optional prefix filter)."""
-    from ..models.cfts_db import CFTSRequirementDB
-
-    req_query = db.query(CFTSRequirementDB.req_id).order_by(CFTSRequirementDB.req_id)
-
-    if query:
-        req_query = req_query.filter(CFTSRequirementDB.req_id.like(f"{query}%"))
+    index = get_autocomplete_index(db)
 
-    req_ids = req_query.limit(100).all()
-    return [req_id[0] for req_id in req_ids if req_id[0]]
\ No newline at end of file
+    if fuzzy and query:
+        return index.req_id_matcher.search(query)
+    return index.req_ids.prefix(query)
@@ -0,0 +1,43 @@
+"""Full-text search API endpoints."""
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..models.search_document import SearchHit
+from ..db.database import get_read_db
+from ..db.search import search_documents_ranked, search_ngram_substring, NGRAM_TRUNCATED_HEADER
+from ..request_timing import TimedRoute
+
+
+router = APIRouter(prefix="/search", tags=["search"], route_class=TimedRoute)
+
+
+@router.get("", response_model=List[SearchHit])
+async def full_text_search(
+    q: str = Query(..., min_length=1, description="Words to search for in requirement, SYS.2 and test case text"),
+    doc_type: Optional[List[str]] = Query(None, description="Restrict to cfts / sys2 / testcase (repeatable)"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_read_db)
+):
+    """Ranked full-text search across CFTS requirements, SYS.2 requirements and test cases."""
+    return search_documents_ranked(db, q, doc_types=doc_type, limit=limit)
+
+
+@router.get("/ja", response_model=List[SearchHit])
+async def japanese_substring_search(
+    response: Response,
+    q: str = Query(..., min_length=2, description="Japanese substring to find (at least 2 characters)"),
+    doc_type: Optional[List[str]] = Query(None, description="Restrict to sys2 / testcase (repeatable)"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Index-driven substring search over Japanese SYS.2 and test case text (bigram index).
+
+    Hits are ranked by number of occurrences. If the query matched too many
+    documents to verify them all, the X-Search-Truncated header is set to
+    "true" and only the lowest-id candidates were searched.
+    """
+    hits, truncated = search_ngram_substring(db, q, doc_types=doc_type, limit=limit)
+    if truncated:
+        response.headers[NGRAM_TRUNCATED_HEADER] = "true"
+    return hits
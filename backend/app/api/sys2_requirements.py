@@ -1,13 +1,14 @@
 """SYS.2 Requirements API endpoints."""
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Dict, List, Literal, Optional
 from ..models.sys2_requirement import SYS2RequirementDetail
-from ..models.cfts_db import CFTSRequirementDB
-from ..db.database import get_db
+from ..models.batch import BatchLookupRequest
+from ..db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from ..lookups import Lookups, get_lookups
+from ..request_timing import TimedRoute
 
 
-router = APIRouter(prefix="/sys2", tags=["sys2"])
+router = APIRouter(prefix="/sys2", tags=["sys2"], route_class=TimedRoute)
 
 
 def db_sys2_to_detail(db_req) -> SYS2RequirementDetail:
@@ -26,14 +27,20 @@ def db_sys2_to_detail(db_req) -> SYS2RequirementDetail:
     )
 
 
+@router.post("/requirement/batch", response_model=Dict[str, List[SYS2RequirementDetail]])
+async def get_sys2_requirements_batch(request: BatchLookupRequest, lookups: Lookups = Depends(get_lookups)):
+    """Get SYS.2 requirement details for many Melco IDs at once, grouped by Melco ID."""
+    grouped = lookups.sys2_by_melco_ids(list(dict.fromkeys(request.ids)))
+    return {
+        melco_id: [db_sys2_to_detail(req) for req in reqs]
+        for melco_id, reqs in grouped.items()
+    }
+
+
 @router.get("/requirement/{melco_id}", response_model=List[SYS2RequirementDetail])
-async def get_sys2_requirement(melco_id: str, db: Session = Depends(get_db)):
+async def get_sys2_requirement(melco_id: str, lookups: Lookups = Depends(get_lookups)):
     """Get SYS.2 requirement details by Melco ID."""
-    from ..models.sys2_requirement import SYS2RequirementDB
-
-    db_requirements = db.query(SYS2RequirementDB).filter(
-        SYS2RequirementDB.melco_id == melco_id
-    ).all()
+    db_requirements = lookups.sys2_by_melco_id(melco_id)
 
     if not db_requirements:
         raise HTTPException(status_code=404, detail=f"Melco ID {melco_id} not found")
@@ -42,15 +49,26 @@ async def get_sys2_requirement(melco_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/by-cfts/{cfts_id}", response_model=List[SYS2RequirementDetail])
-async def get_sys2_by_cfts(cfts_id: str, db: Session = Depends(get_db)):
-    """Get all SYS.2 requirements for a specific CFTS."""
-    from ..models.sys2_requirement import SYS2RequirementDB
+async def get_sys2_by_cfts(
+    cfts_id: str,
+    response: Response,
+    sort: Literal["melco_id", "id"] = Query("melco_id", description="Sort key (ties broken by id)"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    cursor: Optional[str] = Query(None, description=f"Opaque token from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    lookups: Lookups = Depends(get_lookups)
+):
+    """Get all SYS.2 requirements for a specific CFTS (keyset paginated)."""
+    try:
+        db_requirements, next_cursor = lookups.sys2_page_by_cfts_id(
+            cfts_id, sort, cursor, limit, descending=(order == "desc")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    db_requirements = db.query(SYS2RequirementDB).filter(
-        SYS2RequirementDB.cfts_id == cfts_id
-    ).all()
-
-    if not db_requirements:
+    if not db_requirements and not cursor:
         raise HTTPException(status_code=404, detail=f"No SYS.2 requirements found for CFTS {cfts_id}")
 
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [db_sys2_to_detail(req) for req in db_requirements]
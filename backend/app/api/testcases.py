@@ -1,12 +1,14 @@
 """TestCase API endpoints."""
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Dict, List, Literal, Optional
 from ..models.testcase import TestCaseResponse
-from ..db.database import get_db
+from ..models.batch import BatchLookupRequest
+from ..db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from ..lookups import Lookups, get_lookups
+from ..request_timing import TimedRoute
 
 
-router = APIRouter(prefix="/testcases", tags=["testcases"])
+router = APIRouter(prefix="/testcases", tags=["testcases"], route_class=TimedRoute)
 
 
 def db_testcase_to_response(db_tc) -> TestCaseResponse:
@@ -22,17 +24,35 @@ def db_testcase_to_response(db_tc) -> TestCaseResponse:
     )
 
 
-@router.get("/by-feature-id/{feature_id}", response_model=List[TestCaseResponse])
-async def get_testcases_by_feature_id(feature_id: str, db: Session = Depends(get_db)):
-    """Get all TestCases for a specific Feature ID (Melco ID)."""
-    from ..models.testcase import TestCaseDB
-
-    db_testcases = db.query(TestCaseDB).filter(
-        TestCaseDB.feature_id == feature_id
-    ).all()
+@router.post("/by-feature-id/batch", response_model=Dict[str, List[TestCaseResponse]])
+async def get_testcases_by_feature_ids(request: BatchLookupRequest, lookups: Lookups = Depends(get_lookups)):
+    """Get TestCases for many Feature IDs (Melco IDs) at once, grouped by Feature ID."""
+    grouped = lookups.testcases_by_feature_ids(list(dict.fromkeys(request.ids)))
+    return {
+        feature_id: [db_testcase_to_response(tc) for tc in tcs]
+        for feature_id, tcs in grouped.items()
+    }
 
-    if not db_testcases:
-        # Return empty list instead of 404 for better UX
-        return []
 
+@router.get("/by-feature-id/{feature_id}", response_model=List[TestCaseResponse])
+async def get_testcases_by_feature_id(
+    feature_id: str,
+    response: Response,
+    order: Literal["asc", "desc"] = Query("asc"),
+    cursor: Optional[str] = Query(None, description=f"Opaque token from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    lookups: Lookups = Depends(get_lookups)
+):
+    """Get all TestCases for a specific Feature ID (Melco ID), keyset paginated."""
+    try:
+        db_testcases, next_cursor = lookups.testcases_page_by_feature_id(
+            feature_id, cursor, limit, descending=(order == "desc")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    # Return empty list instead of 404 for better UX
     return [db_testcase_to_response(tc) for tc in db_testcases]
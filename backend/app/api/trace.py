@@ -0,0 +1,19 @@
+"""Traceability API endpoints."""
+from fastapi import APIRouter, HTTPException, Depends
+from ..models.trace import TraceResult
+from ..lookups import Lookups, get_lookups
+from ..request_timing import TimedRoute
+
+
+router = APIRouter(prefix="/trace", tags=["trace"], route_class=TimedRoute)
+
+
+@router.get("/{melco_id}", response_model=TraceResult)
+async def get_trace(melco_id: str, lookups: Lookups = Depends(get_lookups)):
+    """Get SYS.2 requirements, test cases and referencing CFTS requirements for a Melco ID."""
+    trace = lookups.trace(melco_id)
+
+    if not (trace["sys2_requirements"] or trace["testcases"] or trace["cfts_requirements"]):
+        raise HTTPException(status_code=404, detail=f"Melco ID {melco_id} not found")
+
+    return TraceResult(**trace)
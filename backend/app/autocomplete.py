@@ -0,0 +1,247 @@
+"""In-process prefix index for the autocomplete endpoints."""
+import os
+import re
+import time
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .db.data_version import get_data_version
+from .metrics import record_cache
+from .models.cfts_db import CFTSRequirementDB, CFTSCatalogDB
+
+logger = logging.getLogger(__name__)
+
+# How often (seconds) a request may re-check the data version; between checks no DB access
+AUTOCOMPLETE_RECHECK_SECONDS = float(os.getenv("AUTOCOMPLETE_RECHECK_SECONDS", "5"))
+AUTOCOMPLETE_LIMIT = 100
+FUZZY_LIMIT = 20
+# Candidates (by shared trigram count) that get a full edit-distance check
+FUZZY_MAX_CANDIDATES = 200
+
+
+class PrefixIndex:
+    """Sorted, de-duplicated string array answering prefix queries with bisect."""
+    __slots__ = ("keys",)
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = sorted({key for key in keys if key})
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def prefix(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """Get up to limit keys starting with prefix, in sorted order."""
+        keys = self.keys
+        start = bisect_left(keys, prefix)
+        end = min(start + limit, len(keys))
+        result = []
+        for position in range(start, end):
+            key = keys[position]
+            if not key.startswith(prefix):
+                break
+            result.append(key)
+        return result
+
+
+def normalize_fuzzy(value: str) -> str:
+    """Lowercase and drop separators so 'Anti Theft', 'anti-theft' and 'AntiTheft' compare equal."""
+    return re.sub(r'[\W_]+', '', unicodedata.normalize("NFKC", value).lower())
+
+
+def _trigrams(value: str) -> set:
+    """Start-padded trigrams; no end padding so a typed prefix shares all of its grams."""
+    padded = f"$${value}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edit_distance(length: int) -> int:
+    """Typo budget for a normalized query of the given length."""
+    if length <= 4:
+        return 1
+    if length <= 8:
+        return 2
+    return 3
+
+
+def bounded_edit_distance(a: str, b: str, bound: int) -> int:
+    """
+    Optimal string alignment distance (edits plus adjacent transpositions).
+
+    Returns bound + 1 as soon as the distance is known to exceed bound.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > bound:
+            return bound + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant matcher over a fixed vocabulary.
+
+    Each value is indexed under one or more keys (e.g. a CFTS label under its
+    ID, its name and the whole label). Candidates come from a trigram inverted
+    index; they are then ranked by bounded edit distance against the whole key
+    or, for partially typed input, against the key prefix of the same length.
+    """
+    __slots__ = ("values", "keys", "key_values", "postings")
+
+    def __init__(self, entries: Iterable[Tuple[str, Iterable[str]]]):
+        self.values: List[str] = []
+        self.keys: List[str] = []
+        self.key_values: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        for value, keys in entries:
+            value_id = len(self.values)
+            self.values.append(value)
+            for key in dict.fromkeys(normalize_fuzzy(key) for key in keys):
+                if not key:
+                    continue
+                key_id = len(self.keys)
+                self.keys.append(key)
+                self.key_values.append(value_id)
+                for gram in _trigrams(key):
+                    self.postings.setdefault(gram, []).append(key_id)
+
+    def search(self, query: str, limit: int = FUZZY_LIMIT) -> List[str]:
+        """Get up to limit values ranked by match quality (best first)."""
+        needle = normalize_fuzzy(query)
+        if not needle:
+            return []
+        bound = max_edit_distance(len(needle))
+
+        grams = _trigrams(needle)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        # Every edit destroys at most three trigrams
+        min_shared = max(1, len(grams) - 3 * bound)
+
+        best: Dict[int, tuple] = {}
+        for key_id, count in shared.most_common(FUZZY_MAX_CANDIDATES):
+            if count < min_shared:
+                break
+            key = self.keys[key_id]
+            full = bounded_edit_distance(needle, key, bound)
+            partial = bounded_edit_distance(needle, key[:len(needle)], bound) if len(key) > len(needle) else full
+            distance = min(full, partial)
+            if distance > bound:
+                continue
+            rank = (distance, full, len(key), key)
+            value_id = self.key_values[key_id]
+            if value_id not in best or rank < best[value_id]:
+                best[value_id] = rank
+
+        ranked = sorted(best, key=lambda value_id: (best[value_id], self.values[value_id]))
+        return [self.values[value_id] for value_id in ranked[:limit]]
+
+
+class AutocompleteIndex:
+    """Immutable autocomplete data for one data version."""
+    __slots__ = ("version", "req_ids", "cfts_labels", "req_id_matcher", "cfts_matcher")
+
+    def __init__(self, version: int, req_ids: PrefixIndex, cfts_labels: List[str],
+                 cfts_keys: Optional[Dict[str, List[str]]] = None):
+        self.version = version
+        self.req_ids = req_ids
+        self.cfts_labels = cfts_labels
+        self.req_id_matcher = FuzzyIndex((req_id, [req_id]) for req_id in req_ids.keys)
+        self.cfts_matcher = FuzzyIndex(
+            (label, (cfts_keys or {}).get(label, [label])) for label in cfts_labels
+        )
+
+    def search_cfts_labels(self, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[str]:
+        """Get CFTS labels whose ID or name starts with query (case-insensitive)."""
+        needle = normalize_fuzzy(query)
+        return [
+            label for label in self.cfts_labels
+            if any(normalize_fuzzy(part).startswith(needle) for part in label.split(" ", 1))
+        ][:limit]
+
+    @classmethod
+    def build(cls, db: Session, version: int) -> "AutocompleteIndex":
+        """Load Req IDs and CFTS labels ('CFTS016 Anti-Theft', from cfts_catalog) from the database."""
+        req_ids = PrefixIndex(db.execute(select(CFTSRequirementDB.req_id)).scalars())
+
+        cfts_labels = []
+        cfts_keys = {}
+        cfts_pairs = db.execute(
+            select(CFTSCatalogDB.cfts_id, CFTSCatalogDB.cfts_name)
+            .where(CFTSCatalogDB.requirement_count > 0)
+            .order_by(CFTSCatalogDB.cfts_id)
+        ).all()
+        if not cfts_pairs:
+            # Catalog not built yet (database predates cfts_catalog)
+            cfts_pairs = db.execute(
+                select(CFTSRequirementDB.cfts_id, CFTSRequirementDB.cfts_name)
+                .distinct()
+                .order_by(CFTSRequirementDB.cfts_id)
+            ).all()
+        for cfts_id, cfts_name in cfts_pairs:
+            if cfts_id:
+                label = f"{cfts_id} {cfts_name}" if cfts_name else cfts_id
+                cfts_labels.append(label)
+                cfts_keys[label] = [cfts_id, cfts_name, label] if cfts_name else [cfts_id]
+
+        return cls(version, req_ids, cfts_labels, cfts_keys)
+
+
+_index: Optional[AutocompleteIndex] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_autocomplete_index(db: Session) -> AutocompleteIndex:
+    """
+    Get the current autocomplete index.
+
+    The data version is re-checked at most every AUTOCOMPLETE_RECHECK_SECONDS;
+    a new index is built and swapped in atomically when it has changed.
+    """
+    global _index, _checked_at
+
+    index = _index
+    if index is not None and time.monotonic() - _checked_at < AUTOCOMPLETE_RECHECK_SECONDS:
+        record_cache("autocomplete", True)
+        return index
+
+    with _lock:
+        if _index is not None and time.monotonic() - _checked_at < AUTOCOMPLETE_RECHECK_SECONDS:
+            record_cache("autocomplete", True)
+            return _index
+
+        version = get_data_version(db)
+        stale = _index is None or _index.version != version
+        record_cache("autocomplete", not stale)
+        if stale:
+            started = time.perf_counter()
+            _index = AutocompleteIndex.build(db, version)
+            logger.info(
+                f"Autocomplete index built for data version {version}: "
+                f"{len(_index.req_ids)} req ids, {len(_index.cfts_labels)} CFTS "
+                f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+            )
+        _checked_at = time.monotonic()
+        return _index
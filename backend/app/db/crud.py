@@ -1,10 +1,20 @@
 """CRUD operations for CFTS requirements."""
+import json
+import re
+from datetime import datetime, timezone
+from sqlalchemy import select, func, literal, literal_column, any_, String, Text, Row
+from sqlalchemy.dialects.postgresql import aggregate_order_by, ARRAY
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..models.cfts_db import CFTSRequirementDB
+from typing import Dict, List, Optional
+from .pagination import keyset_page, DEFAULT_PAGE_SIZE
+from ..tracing import traced
+from ..models.cfts_db import CFTSRequirementDB, CFTSMelcoLinkDB, CFTSCatalogDB
 from ..models.requirement import CFTSRequirement
+from ..models.sys2_requirement import SYS2RequirementDB, SYS2RequirementDetail
+from ..models.testcase import TestCaseDB, TestCaseResponse
 
 
+@traced()
 def create_cfts_requirement(db: Session, requirement: CFTSRequirement) -> CFTSRequirementDB:
     """Create a new CFTS requirement."""
     db_requirement = CFTSRequirementDB(
@@ -22,28 +32,387 @@ def create_cfts_requirement(db: Session, requirement: CFTSRequirement) -> CFTSRe
     return db_requirement
 
 
-def get_cfts_requirements_by_cfts_id(db: Session, cfts_id: str) -> List[CFTSRequirementDB]:
-    """Get all requirements for a specific CFTS ID (supports partial matching)."""
+# Columns exposed by the CFTSRequirement response model (in output order)
+CFTS_RESPONSE_COLUMNS = tuple(CFTSRequirement.model_fields)
+
+
+def response_columns(db_model, response_model) -> list:
+    """Get the model columns needed to build a response model (column projection)."""
+    return [getattr(db_model, name) for name in response_model.model_fields]
+
+
+def ids_filter(db: Session, column, ids: List[str]):
+    """
+    Match a column against many IDs with a single bind parameter where possible.
+
+    PostgreSQL gets ``column = ANY(:ids)`` with one array parameter; other
+    dialects use an expanding IN list.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(list(ids), ARRAY(String)))
+    return column.in_(ids)
+
+
+def group_rows_by(rows, key: str, ids: List[str]) -> Dict[str, list]:
+    """Group rows by an ID attribute; every requested ID gets a (possibly empty) list."""
+    grouped = {id_: [] for id_ in ids}
+    for row in rows:
+        grouped.setdefault(getattr(row, key), []).append(row)
+    return grouped
+
+
+def cfts_id_filter(cfts_id: str):
+    """Build the WHERE clause used for CFTS ID searches (supports partial matching)."""
     # If user inputs just "CFTS016", search for all CFTS IDs that start with it
     if not cfts_id.endswith('-'):
-        return db.query(CFTSRequirementDB).filter(
-            CFTSRequirementDB.cfts_id.like(f"{cfts_id}%")
-        ).all()
-    else:
-        # Exact match for full CFTS ID
-        return db.query(CFTSRequirementDB).filter(CFTSRequirementDB.cfts_id == cfts_id).all()
+        return CFTSRequirementDB.cfts_id.like(f"{cfts_id}%")
+    # Exact match for full CFTS ID
+    return CFTSRequirementDB.cfts_id == cfts_id
+
+
+@traced()
+def get_cfts_requirements_by_cfts_id(db: Session, cfts_id: str) -> List[Row]:
+    """
+    Get all requirements for a specific CFTS ID (supports partial matching).
+
+    Only the response columns are selected: the result is Row objects, not
+    CFTSRequirementDB instances. They support attribute access to those
+    columns but skip identity-map hydration.
+    """
+    return db.query(*response_columns(CFTSRequirementDB, CFTSRequirement)).filter(
+        cfts_id_filter(cfts_id)
+    ).order_by(CFTSRequirementDB.id).all()
+
+
+def _json_value(value):
+    """Serialize a column value the same way the Pydantic response would."""
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _search_result_json(db: Session, search_cfts_id, where, target_req_id: Optional[str]) -> Optional[bytes]:
+    """
+    Build a serialized CFTSSearchResult document in a single statement.
+
+    On PostgreSQL the whole document (rows ordered by id, plus the count) is
+    assembled with json_agg/json_build_object, so no ORM objects are created.
+    Other dialects fall back to a projected row query serialized in Python.
+
+    Returns:
+        UTF-8 JSON bytes, or None if no requirement matched
+    """
+    columns = [getattr(CFTSRequirementDB, name) for name in CFTS_RESPONSE_COLUMNS]
+
+    if db.get_bind().dialect.name == "postgresql":
+        row_object = func.json_build_object(
+            *[part for name, column in zip(CFTS_RESPONSE_COLUMNS, columns) for part in (literal(name), column)]
+        )
+        document = func.json_build_object(
+            literal("cfts_id"), search_cfts_id,
+            literal("requirements"), func.json_agg(aggregate_order_by(row_object, CFTSRequirementDB.id)),
+            literal("total_count"), func.count(),
+            literal("target_req_id"), literal(target_req_id, Text),
+        )
+        total_count, payload = db.execute(
+            select(func.count(), document.cast(Text)).where(where)
+        ).one()
+        return payload.encode("utf-8") if total_count else None
+
+    rows = db.execute(
+        select(search_cfts_id, *columns).where(where).order_by(CFTSRequirementDB.id)
+    ).all()
+    if not rows:
+        return None
+
+    requirements = [
+        {name: _json_value(value) for name, value in zip(CFTS_RESPONSE_COLUMNS, row[1:])}
+        for row in rows
+    ]
+    return json.dumps({
+        "cfts_id": rows[0][0],
+        "requirements": requirements,
+        "total_count": len(requirements),
+        "target_req_id": target_req_id,
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@traced()
+def search_cfts_json(db: Session, cfts_id: str) -> Optional[bytes]:
+    """Get the serialized CFTS search result for a CFTS ID (database-side JSON)."""
+    return _search_result_json(db, literal(cfts_id, Text), cfts_id_filter(cfts_id), None)
+
+
+def _owner_cfts_id(req_id: str):
+    """Scalar subquery resolving the CFTS ID that owns a Req.ID."""
+    return (
+        select(CFTSRequirementDB.cfts_id)
+        .where(CFTSRequirementDB.req_id == req_id)
+        .order_by(CFTSRequirementDB.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+@traced()
+def search_req_json(db: Session, req_id: str) -> Optional[bytes]:
+    """Get the serialized CFTS search result containing a Req.ID (database-side JSON)."""
+    owner_cfts_id = _owner_cfts_id(req_id)
+    return _search_result_json(
+        db, owner_cfts_id, CFTSRequirementDB.cfts_id.like(owner_cfts_id + "%"), req_id
+    )
+
+
+@traced()
+def get_cfts_requirements_by_req_id(db: Session, req_id: str) -> List[Row]:
+    """
+    Get all requirements of the CFTS that contains a Req.ID, in one statement.
+
+    Each Row carries the owning CFTS ID as ``search_cfts_id`` next to the
+    response columns. Returns an empty list if the Req.ID does not exist.
+    """
+    owner_cfts_id = _owner_cfts_id(req_id)
+    return db.query(
+        owner_cfts_id.label("search_cfts_id"),
+        *response_columns(CFTSRequirementDB, CFTSRequirement)
+    ).filter(
+        CFTSRequirementDB.cfts_id.like(owner_cfts_id + "%")
+    ).order_by(CFTSRequirementDB.id).all()
+
+
+def split_melco_ids(melco_id_field: Optional[str]) -> List[str]:
+    """Split a raw melco_id field (newline/comma separated, may contain '#') into unique IDs."""
+    if not melco_id_field:
+        return []
+    ids = (part.strip().strip('#') for part in re.split(r'[\n,]+', melco_id_field))
+    return list(dict.fromkeys(id_ for id_ in ids if id_))
+
+
+def sync_melco_links(db: Session, cfts_requirement_id: int, melco_id_field: Optional[str]) -> None:
+    """Bring the link rows of one CFTS requirement in line with its melco_id field (no commit)."""
+    wanted = set(split_melco_ids(melco_id_field))
+    existing = {
+        link.melco_id: link
+        for link in db.query(CFTSMelcoLinkDB).filter(
+            CFTSMelcoLinkDB.cfts_requirement_id == cfts_requirement_id
+        )
+    }
+
+    for melco_id, link in existing.items():
+        if melco_id not in wanted:
+            db.delete(link)
+    for melco_id in wanted - existing.keys():
+        db.add(CFTSMelcoLinkDB(cfts_requirement_id=cfts_requirement_id, melco_id=melco_id))
+
+
+@traced()
+def rebuild_melco_links(db: Session) -> int:
+    """
+    Rebuild the whole link table from cfts_requirements.melco_id.
+
+    Returns:
+        Number of link rows written
+    """
+    db.query(CFTSMelcoLinkDB).delete(synchronize_session=False)
+    links = [
+        {"cfts_requirement_id": req_pk, "melco_id": melco_id}
+        for req_pk, melco_id_field in db.query(CFTSRequirementDB.id, CFTSRequirementDB.melco_id)
+        for melco_id in split_melco_ids(melco_id_field)
+    ]
+    if links:
+        db.execute(CFTSMelcoLinkDB.__table__.insert(), links)
+    db.commit()
+    return len(links)
+
+
+def _referencing_requirement_ids(melco_id: str):
+    """Subquery of CFTS requirement primary keys that reference a Melco ID (link table index)."""
+    return select(CFTSMelcoLinkDB.cfts_requirement_id).where(CFTSMelcoLinkDB.melco_id == melco_id)
+
+
+@traced()
+def get_cfts_requirements_by_melco_id(db: Session, melco_id: str) -> List[Row]:
+    """Get all CFTS requirements that reference a Melco ID (reverse lookup; response-column rows)."""
+    return db.query(*response_columns(CFTSRequirementDB, CFTSRequirement)).filter(
+        CFTSRequirementDB.id.in_(_referencing_requirement_ids(melco_id))
+    ).order_by(CFTSRequirementDB.id).all()
+
+
+def _json_rows_subquery(db: Session, db_model, response_model, where, order_by):
+    """
+    Scalar subquery returning the matching rows as a JSON array (text).
 
+    Uses json_agg/json_build_object on PostgreSQL and the JSON1
+    json_group_array/json_object functions on SQLite.
+    """
+    names = list(response_model.model_fields)
 
-def get_requirement_by_req_id(db: Session, req_id: str) -> Optional[CFTSRequirementDB]:
-    """Get a specific requirement by Req.ID."""
-    return db.query(CFTSRequirementDB).filter(CFTSRequirementDB.req_id == req_id).first()
+    if db.get_bind().dialect.name == "postgresql":
+        row_object = func.json_build_object(
+            *[part for name in names for part in (literal(name), getattr(db_model, name))]
+        )
+        return select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(row_object, order_by)),
+                literal_column("'[]'::json")
+            ).cast(Text)
+        ).where(where).scalar_subquery()
 
+    ordered = select(*response_columns(db_model, response_model)).where(where).order_by(order_by).subquery()
+    row_object = func.json_object(
+        *[part for name in names for part in (literal(name), ordered.c[name])]
+    )
+    return select(func.json_group_array(row_object)).select_from(ordered).scalar_subquery()
+
+
+@traced()
+def get_trace_by_melco_id(db: Session, melco_id: str) -> dict:
+    """
+    Get the full traceability record of a Melco ID in one database round trip.
+
+    Returns:
+        Dict with sys2_requirements, testcases and cfts_requirements lists
+    """
+    sys2_json, testcases_json, cfts_json = db.execute(select(
+        _json_rows_subquery(
+            db, SYS2RequirementDB, SYS2RequirementDetail,
+            SYS2RequirementDB.melco_id == melco_id, SYS2RequirementDB.id
+        ),
+        _json_rows_subquery(
+            db, TestCaseDB, TestCaseResponse,
+            TestCaseDB.feature_id == melco_id, TestCaseDB.id
+        ),
+        _json_rows_subquery(
+            db, CFTSRequirementDB, CFTSRequirement,
+            CFTSRequirementDB.id.in_(_referencing_requirement_ids(melco_id)), CFTSRequirementDB.id
+        ),
+    )).one()
+
+    return {
+        "melco_id": melco_id,
+        "sys2_requirements": json.loads(sys2_json or "[]"),
+        "testcases": json.loads(testcases_json or "[]"),
+        "cfts_requirements": json.loads(cfts_json or "[]"),
+    }
+
+
+@traced()
+def get_cfts_requirements_by_cfts_ids(db: Session, cfts_ids: List[str]) -> List[Row]:
+    """Get all requirements for many exact CFTS IDs in one query (response-column rows)."""
+    return db.query(*response_columns(CFTSRequirementDB, CFTSRequirement)).filter(
+        ids_filter(db, CFTSRequirementDB.cfts_id, cfts_ids)
+    ).order_by(CFTSRequirementDB.id).all()
+
+
+@traced()
+def get_requirement_by_req_id(db: Session, req_id: str) -> Optional[Row]:
+    """Get a specific requirement by Req.ID (a row of the response columns, or None)."""
+    return db.query(*response_columns(CFTSRequirementDB, CFTSRequirement)).filter(
+        CFTSRequirementDB.req_id == req_id
+    ).first()
+
+
+# Sort orders for CFTS requirement lists (each backed by an index ending in id)
+CFTS_SORT_ORDERS = {
+    "cfts_id": (CFTSRequirementDB.cfts_id, CFTSRequirementDB.req_id, CFTSRequirementDB.id),
+    "req_id": (CFTSRequirementDB.req_id, CFTSRequirementDB.id),
+    "id": (CFTSRequirementDB.id,),
+}
+
+
+@traced()
+def get_all_cfts_requirements(
+    db: Session,
+    sort: str = "cfts_id",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+):
+    """
+    Get one keyset page of CFTS requirements.
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    query = db.query(*response_columns(CFTSRequirementDB, CFTSRequirement))
+    return keyset_page(query, CFTS_SORT_ORDERS, sort, cursor, limit, descending)
+
+
+SYS2_SORT_ORDERS = {
+    "melco_id": (SYS2RequirementDB.melco_id, SYS2RequirementDB.id),
+    "id": (SYS2RequirementDB.id,),
+}
+
+
+@traced()
+def get_sys2_requirements_page_by_cfts_id(
+    db: Session,
+    cfts_id: str,
+    sort: str = "melco_id",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+):
+    """
+    Get one keyset page of the SYS.2 requirements of a CFTS.
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    query = db.query(*response_columns(SYS2RequirementDB, SYS2RequirementDetail)).filter(
+        SYS2RequirementDB.cfts_id == cfts_id
+    )
+    return keyset_page(query, SYS2_SORT_ORDERS, sort, cursor, limit, descending)
+
+
+@traced()
+def get_sys2_requirements_by_melco_id(db: Session, melco_id: str) -> List[Row]:
+    """Get the SYS.2 requirements of a Melco ID (response-column rows)."""
+    return db.query(*response_columns(SYS2RequirementDB, SYS2RequirementDetail)).filter(
+        SYS2RequirementDB.melco_id == melco_id
+    ).order_by(SYS2RequirementDB.id).all()
+
+
+@traced()
+def get_sys2_requirements_by_melco_ids(db: Session, melco_ids: List[str]) -> List[Row]:
+    """Get the SYS.2 requirements of many Melco IDs in one query (response-column rows)."""
+    return db.query(*response_columns(SYS2RequirementDB, SYS2RequirementDetail)).filter(
+        ids_filter(db, SYS2RequirementDB.melco_id, melco_ids)
+    ).order_by(SYS2RequirementDB.id).all()
 
-def get_all_cfts_requirements(db: Session, skip: int = 0, limit: int = 1000) -> List[CFTSRequirementDB]:
-    """Get all CFTS requirements."""
-    return db.query(CFTSRequirementDB).offset(skip).limit(limit).all()
 
+TESTCASE_SORT_ORDERS = {
+    "id": (TestCaseDB.id,),
+}
 
+
+@traced()
+def get_testcases_page_by_feature_id(
+    db: Session,
+    feature_id: str,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+):
+    """
+    Get one keyset page of the test cases of a Feature ID (Melco ID).
+
+    Returns:
+        (rows, next_cursor); next_cursor is None on the last page
+    """
+    query = db.query(*response_columns(TestCaseDB, TestCaseResponse)).filter(
+        TestCaseDB.feature_id == feature_id
+    )
+    return keyset_page(query, TESTCASE_SORT_ORDERS, "id", cursor, limit, descending)
+
+
+@traced()
+def get_testcases_by_feature_ids(db: Session, feature_ids: List[str]) -> List[Row]:
+    """Get the test cases of many Feature IDs (Melco IDs) in one query (response-column rows)."""
+    return db.query(*response_columns(TestCaseDB, TestCaseResponse)).filter(
+        ids_filter(db, TestCaseDB.feature_id, feature_ids)
+    ).order_by(TestCaseDB.id).all()
+
+
+@traced()
 def bulk_create_cfts_requirements(db: Session, requirements: List[CFTSRequirement]) -> int:
     """Bulk create CFTS requirements (skip duplicates based on polarian_id)."""
     inserted_count = 0
@@ -68,4 +437,68 @@ def bulk_create_cfts_requirements(db: Session, requirements: List[CFTSRequiremen
             inserted_count += 1
 
     db.commit()
-    return inserted_count
\ No newline at end of file
+    return inserted_count
+
+
+@traced()
+def get_cfts_catalog(db: Session) -> List[CFTSCatalogDB]:
+    """Get all CFTS catalog entries ordered by CFTS ID."""
+    return db.query(CFTSCatalogDB).order_by(CFTSCatalogDB.cfts_id).all()
+
+
+@traced()
+def refresh_cfts_catalog(db: Session, source_files: Optional[Dict[str, str]] = None) -> int:
+    """
+    Recompute the per-CFTS counts of the catalog after an import and commit.
+
+    Args:
+        source_files: Imported Excel file name per CFTS ID (CFTS import only)
+
+    Returns:
+        Number of catalog entries
+    """
+    source_files = source_files or {}
+
+    requirement_stats = {
+        cfts_id: (count, name)
+        for cfts_id, count, name in db.query(
+            CFTSRequirementDB.cfts_id, func.count(), func.max(CFTSRequirementDB.cfts_name)
+        ).group_by(CFTSRequirementDB.cfts_id)
+    }
+    sys2_counts = dict(
+        db.query(SYS2RequirementDB.cfts_id, func.count()).group_by(SYS2RequirementDB.cfts_id).all()
+    )
+    testcase_counts = dict(
+        db.query(SYS2RequirementDB.cfts_id, func.count(TestCaseDB.id))
+        .join(TestCaseDB, TestCaseDB.feature_id == SYS2RequirementDB.melco_id)
+        .group_by(SYS2RequirementDB.cfts_id).all()
+    )
+
+    cfts_ids = {cfts_id for cfts_id in (*requirement_stats, *sys2_counts) if cfts_id}
+    existing = {entry.cfts_id: entry for entry in db.query(CFTSCatalogDB)}
+    now = datetime.now(timezone.utc)
+
+    for cfts_id, entry in existing.items():
+        if cfts_id not in cfts_ids:
+            db.delete(entry)
+
+    for cfts_id in cfts_ids:
+        requirement_count, cfts_name = requirement_stats.get(cfts_id, (0, ""))
+        counts = (requirement_count, sys2_counts.get(cfts_id, 0), testcase_counts.get(cfts_id, 0))
+
+        entry = existing.get(cfts_id)
+        if entry is None:
+            entry = CFTSCatalogDB(cfts_id=cfts_id, source_file="")
+            db.add(entry)
+        elif (entry.requirement_count, entry.sys2_count, entry.testcase_count) == counts \
+                and cfts_id not in source_files:
+            continue  # Untouched by this import
+
+        entry.cfts_name = cfts_name or entry.cfts_name or ""
+        entry.requirement_count, entry.sys2_count, entry.testcase_count = counts
+        if cfts_id in source_files:
+            entry.source_file = source_files[cfts_id]
+        entry.last_imported_at = now
+
+    db.commit()
+    return len(cfts_ids)
@@ -0,0 +1,32 @@
+"""Data version tracking (bumped by importers, read by caches)."""
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from ..models.data_version import DataVersionDB
+
+DATA_VERSION_ROW_ID = 1
+
+
+def get_data_version(db: Session) -> int:
+    """Get the current data version (0 if nothing has been imported yet)."""
+    version = db.execute(
+        select(DataVersionDB.version).where(DataVersionDB.id == DATA_VERSION_ROW_ID)
+    ).scalar()
+    return version or 0
+
+
+def bump_data_version(db: Session) -> int:
+    """
+    Increment the data version after an import and commit.
+
+    Returns:
+        The new data version
+    """
+    result = db.execute(
+        update(DataVersionDB)
+        .where(DataVersionDB.id == DATA_VERSION_ROW_ID)
+        .values(version=DataVersionDB.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(DataVersionDB(id=DATA_VERSION_ROW_ID, version=1))
+    db.commit()
+    return get_data_version(db)
@@ -0,0 +1,116 @@
+"""Streaming table exports (NDJSON / CSV) backed by server-side cursors."""
+import csv
+import io
+import json
+import os
+from typing import Iterator, List, Optional
+
+from sqlalchemy import select
+
+from .crud import ids_filter
+from .database import read_session
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+
+
+# Rows fetched per round trip; also the number of rows serialised per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+EXPORT_TABLES = {
+    "cfts": CFTSRequirementDB,
+    "sys2": SYS2RequirementDB,
+    "testcases": TestCaseDB,
+}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_columns(table: str) -> List[str]:
+    """Column names of an exportable table, in table order (deferred columns included)."""
+    return [column.name for column in EXPORT_TABLES[table].__table__.columns]
+
+
+def cfts_filter(db, table: str, cfts_ids: List[str]):
+    """
+    WHERE clause restricting an export table to CFTS IDs.
+
+    Test cases carry no CFTS ID of their own; they are matched through the
+    Melco IDs of the SYS.2 requirements that belong to the requested CFTS.
+    """
+    model = EXPORT_TABLES[table]
+    if table == "testcases":
+        melco_ids = select(SYS2RequirementDB.melco_id).where(
+            ids_filter(db, SYS2RequirementDB.cfts_id, cfts_ids)
+        )
+        return model.feature_id.in_(melco_ids)
+    return ids_filter(db, model.cfts_id, cfts_ids)
+
+
+def build_export_statement(db, table: str, cfts_ids: Optional[List[str]] = None):
+    """SELECT every column of an export table, optionally restricted to CFTS IDs."""
+    model = EXPORT_TABLES[table]
+    stmt = select(*model.__table__.columns)
+    if cfts_ids:
+        stmt = stmt.where(cfts_filter(db, table, cfts_ids))
+    return stmt.order_by(model.id)
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _ndjson_chunk(columns: List[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        ["" if value is None else value for value in row] for row in rows
+    )
+    return buffer.getvalue()
+
+
+def iter_export_rows(table: str, cfts_ids: Optional[List[str]] = None) -> Iterator[list]:
+    """
+    Yield batches of rows from an export table using a server-side cursor.
+
+    Opens its own session so the generator can outlive the request scope
+    (StreamingResponse iterates after the endpoint has returned).
+    """
+    db = read_session()
+    try:
+        stmt = build_export_statement(db, table, cfts_ids).execution_options(
+            yield_per=EXPORT_BATCH_SIZE
+        )
+        for partition in db.execute(stmt).partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def stream_export(table: str, fmt: str, cfts_ids: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Serialise an export table as NDJSON or CSV, one chunk per fetched batch.
+
+    Memory use is bounded by EXPORT_BATCH_SIZE rows regardless of table size.
+    """
+    columns = export_columns(table)
+
+    if fmt == "csv":
+        # Header first, so the client receives bytes before the query runs
+        yield _csv_chunk([columns])
+        for rows in iter_export_rows(table, cfts_ids):
+            yield _csv_chunk(rows)
+    else:
+        for rows in iter_export_rows(table, cfts_ids):
+            yield _ndjson_chunk(columns, rows)
@@ -0,0 +1,80 @@
+"""Keyset (cursor) pagination helpers for list endpoints."""
+import base64
+import json
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Response header carrying the opaque token of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort: str, values: Sequence) -> str:
+    """Encode the sort key of the last row into an opaque page token."""
+    payload = json.dumps({"s": sort, "k": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sort: str, token: str, key_length: int) -> List:
+    """
+    Decode a page token produced by encode_cursor.
+
+    Raises:
+        ValueError: if the token is malformed or was issued for another sort order
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["k"]
+        token_sort = payload["s"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if token_sort != sort or not isinstance(values, list) or len(values) != key_length:
+        raise ValueError("Cursor does not match the requested sort order")
+    return values
+
+
+def keyset_page(
+    query: Query,
+    sort_orders: Dict[str, Sequence],
+    sort: str,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+) -> Tuple[list, Optional[str]]:
+    """
+    Fetch one page of a query ordered by a unique column tuple.
+
+    Every sort order must end with the primary key so the key is unique; each
+    tuple should be backed by a matching (composite) index so deep pages cost
+    the same as the first one. Rows with NULL in a sort column are not listed
+    in that order: row-value comparisons never match NULLs, so such rows could
+    not be paged through consistently (the in-memory read model skips them too).
+
+    Returns:
+        (rows, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        ValueError: on an unknown sort or an invalid cursor
+    """
+    if sort not in sort_orders:
+        raise ValueError(f"Unknown sort '{sort}' (expected one of: {', '.join(sort_orders)})")
+    columns = list(sort_orders[sort])
+    key = tuple_(*columns)
+
+    query = query.filter(*[column.isnot(None) for column in columns[:-1]])
+    query = query.add_columns(*[column.label(f"_sort_{i}") for i, column in enumerate(columns)])
+    if cursor:
+        values = decode_cursor(sort, cursor, len(columns))
+        query = query.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, [getattr(last, f"_sort_{i}") for i in range(len(columns))])
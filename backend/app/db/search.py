@@ -0,0 +1,283 @@
+"""Full-text search index maintenance and queries."""
+import unicodedata
+from sqlalchemy import select, func, literal, text, bindparam
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from ..models.cfts_db import CFTSRequirementDB
+from ..models.sys2_requirement import SYS2RequirementDB
+from ..models.testcase import TestCaseDB
+from ..models.search_document import search_documents, NGramPostingDB, SEARCH_TS_CONFIG
+
+# doc_type -> (model, key column, cfts_id column, searchable text columns)
+SEARCH_SOURCES = {
+    "cfts": (
+        CFTSRequirementDB, CFTSRequirementDB.req_id, CFTSRequirementDB.cfts_id,
+        [CFTSRequirementDB.description, CFTSRequirementDB.sr24_description],
+    ),
+    "sys2": (
+        SYS2RequirementDB, SYS2RequirementDB.melco_id, SYS2RequirementDB.cfts_id,
+        [SYS2RequirementDB.requirement_en, SYS2RequirementDB.verification_criteria],
+    ),
+    "testcase": (
+        TestCaseDB, TestCaseDB.feature_id, None,
+        [TestCaseDB.test_item_en],
+    ),
+}
+
+# doc_type -> (model, key column, cfts_id column, Japanese text columns) for the bigram index
+NGRAM_SOURCES = {
+    "sys2": (
+        SYS2RequirementDB, SYS2RequirementDB.melco_id, SYS2RequirementDB.cfts_id,
+        [SYS2RequirementDB.requirement_en, SYS2RequirementDB.reason_en,
+         SYS2RequirementDB.supplement_en, SYS2RequirementDB.verification_criteria],
+    ),
+    "testcase": (
+        TestCaseDB, TestCaseDB.feature_id, None,
+        [TestCaseDB.precondition_procedure_jp, TestCaseDB.criteria_jp],
+    ),
+}
+
+SNIPPET_START = "<mark>"
+SNIPPET_STOP = "</mark>"
+SNIPPET_CONTEXT = 20
+NGRAM_BATCH_SIZE = 5000
+# Candidates (documents containing every query bigram) read per doc type; short queries
+# (a single bigram) match most documents, so the source text is never loaded for all of them
+NGRAM_MAX_CANDIDATES = 1000
+# Candidates fetched and verified per round trip
+NGRAM_VERIFY_BATCH = 200
+# Response header set when some doc type had more than NGRAM_MAX_CANDIDATES candidates
+NGRAM_TRUNCATED_HEADER = "X-Search-Truncated"
+
+
+def refresh_search_index(db: Session, doc_type: str) -> int:
+    """
+    Rebuild the search documents of one source table in a single INSERT ... SELECT.
+
+    Returns:
+        Number of indexed documents
+    """
+    model, key_column, cfts_column, text_columns = SEARCH_SOURCES[doc_type]
+
+    content = func.coalesce(text_columns[0], "")
+    for column in text_columns[1:]:
+        content = content + "\n" + func.coalesce(column, "")
+
+    source = select(
+        literal(doc_type),
+        model.id,
+        key_column,
+        cfts_column if cfts_column is not None else literal(""),
+        content,
+    )
+
+    db.execute(search_documents.delete().where(search_documents.c.doc_type == doc_type))
+    result = db.execute(search_documents.insert().from_select(
+        ["doc_type", "doc_id", "doc_key", "cfts_id", "content"], source
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def refresh_all_search_indexes(db: Session) -> Dict[str, int]:
+    """Rebuild the search documents of every source table."""
+    return {doc_type: refresh_search_index(db, doc_type) for doc_type in SEARCH_SOURCES}
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term so FTS5 treats user input as plain words (implicit AND)."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+
+def search_documents_ranked(
+    db: Session, query: str, doc_types: Optional[List[str]] = None, limit: int = 20
+) -> List[dict]:
+    """
+    Run a ranked full-text search across CFTS, SYS.2 and test case text.
+
+    PostgreSQL matches the GIN-indexed tsvector with websearch_to_tsquery and
+    ranks with ts_rank; snippets are only built for the returned page.
+    SQLite uses the FTS5 table with bm25 ranking and snippet().
+    """
+    if not query.strip():
+        return []
+
+    type_filter = "AND doc_type IN :doc_types" if doc_types else ""
+    params = {"query": query, "limit": limit}
+
+    if db.get_bind().dialect.name == "postgresql":
+        statement = text(f"""
+            SELECT hits.doc_type, hits.doc_id, hits.doc_key, hits.cfts_id, hits.score,
+                   ts_headline('{SEARCH_TS_CONFIG}', hits.content, hits.tsq,
+                               'StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, MaxFragments=2, MaxWords=20, MinWords=5') AS snippet
+            FROM (
+                SELECT doc_type, doc_id, doc_key, cfts_id, content, tsq, ts_rank(search_vector, tsq) AS score
+                FROM search_documents, websearch_to_tsquery('{SEARCH_TS_CONFIG}', :query) AS tsq
+                WHERE search_vector @@ tsq {type_filter}
+                ORDER BY score DESC
+                LIMIT :limit
+            ) AS hits
+            ORDER BY hits.score DESC
+        """)
+    else:
+        params["query"] = _fts5_query(query)
+        statement = text(f"""
+            SELECT doc_type, doc_id, doc_key, cfts_id, -bm25(search_documents) AS score,
+                   snippet(search_documents, 4, '{SNIPPET_START}', '{SNIPPET_STOP}', '…', 16) AS snippet
+            FROM search_documents
+            WHERE search_documents MATCH :query {type_filter}
+            ORDER BY bm25(search_documents)
+            LIMIT :limit
+        """)
+
+    if doc_types:
+        statement = statement.bindparams(bindparam("doc_types", expanding=True))
+        params["doc_types"] = list(doc_types)
+
+    rows = db.execute(statement, params).all()
+    return [
+        {
+            "doc_type": doc_type,
+            "doc_id": doc_id,
+            "key": doc_key,
+            "cfts_id": cfts_id or None,
+            "score": float(score),
+            "snippet": snippet or "",
+        }
+        for doc_type, doc_id, doc_key, cfts_id, score, snippet in rows
+    ]
+
+
+def normalize_ngram_text(value: Optional[str]) -> str:
+    """NFKC-normalize and lowercase text so full-width/half-width variants match."""
+    return unicodedata.normalize("NFKC", value or "").lower()
+
+
+def text_bigrams(value: str) -> set:
+    """Distinct bigrams of normalized text, skipping pairs that span whitespace."""
+    return {
+        value[i:i + 2]
+        for i in range(len(value) - 1)
+        if not (value[i].isspace() or value[i + 1].isspace())
+    }
+
+
+def refresh_ngram_index(db: Session, doc_type: str) -> int:
+    """
+    Rebuild the bigram postings of one source table.
+
+    Returns:
+        Number of posting rows written
+    """
+    model, _, _, text_columns = NGRAM_SOURCES[doc_type]
+
+    db.query(NGramPostingDB).filter(NGramPostingDB.doc_type == doc_type).delete(synchronize_session=False)
+
+    written = 0
+    batch = []
+    rows = db.execute(select(model.id, *text_columns).execution_options(yield_per=NGRAM_BATCH_SIZE))
+    for doc_id, *values in rows:
+        grams = set()
+        for value in values:
+            grams |= text_bigrams(normalize_ngram_text(value))
+        batch.extend({"gram": gram, "doc_type": doc_type, "doc_id": doc_id} for gram in grams)
+        if len(batch) >= NGRAM_BATCH_SIZE:
+            db.execute(NGramPostingDB.__table__.insert(), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.execute(NGramPostingDB.__table__.insert(), batch)
+        written += len(batch)
+
+    db.commit()
+    return written
+
+
+def refresh_all_ngram_indexes(db: Session) -> Dict[str, int]:
+    """Rebuild the bigram postings of every Japanese text source."""
+    return {doc_type: refresh_ngram_index(db, doc_type) for doc_type in NGRAM_SOURCES}
+
+
+def _ngram_snippet(original: str, normalized: str, needle: str) -> str:
+    """Cut a snippet around the first occurrence of the (normalized) needle."""
+    # Show the original text when normalization kept character positions intact
+    display = original if len(original) == len(normalized) else normalized
+    position = normalized.find(needle)
+    start = max(position - SNIPPET_CONTEXT, 0)
+    end = position + len(needle)
+    return (
+        ("…" if start else "")
+        + display[start:position]
+        + SNIPPET_START + display[position:end] + SNIPPET_STOP
+        + display[end:end + SNIPPET_CONTEXT]
+        + ("…" if end + SNIPPET_CONTEXT < len(display) else "")
+    )
+
+
+def search_ngram_substring(
+    db: Session, query: str, doc_types: Optional[List[str]] = None, limit: int = 20
+) -> Tuple[List[dict], bool]:
+    """
+    Substring search over Japanese text through the bigram index.
+
+    Candidate documents must contain every bigram of the query (an index
+    lookup on ngram_postings.gram). At most NGRAM_MAX_CANDIDATES per doc type
+    are read, the lowest ids first. All of them are verified against the
+    source text batch by batch. The matches are then ranked by number of
+    occurrences (ties in id order) and cut to limit.
+
+    Returns:
+        (hits, truncated); truncated is True when a doc type had more
+        candidates than NGRAM_MAX_CANDIDATES, so later documents were not searched
+    """
+    needle = normalize_ngram_text(query).strip()
+    grams = text_bigrams(needle)
+    if not grams:
+        return [], False
+
+    hits = []
+    truncated = False
+    for doc_type in (doc_types or NGRAM_SOURCES):
+        if doc_type not in NGRAM_SOURCES:
+            continue
+        model, key_column, cfts_column, text_columns = NGRAM_SOURCES[doc_type]
+
+        candidate_ids = select(NGramPostingDB.doc_id).where(
+            NGramPostingDB.doc_type == doc_type,
+            NGramPostingDB.gram.in_(grams),
+        ).group_by(NGramPostingDB.doc_id).having(
+            func.count() == len(grams)
+        ).order_by(NGramPostingDB.doc_id).limit(NGRAM_MAX_CANDIDATES + 1)
+
+        rows = db.execute(
+            select(
+                model.id, key_column,
+                cfts_column if cfts_column is not None else literal(""),
+                *text_columns
+            ).where(model.id.in_(candidate_ids)).order_by(model.id)
+            .execution_options(yield_per=NGRAM_VERIFY_BATCH)
+        )
+        for position, (doc_id, doc_key, cfts_id, *values) in enumerate(rows):
+            if position == NGRAM_MAX_CANDIDATES:
+                truncated = True
+                break
+            originals = [value or "" for value in values]
+            texts = [normalize_ngram_text(value) for value in originals]
+            occurrences = sum(value.count(needle) for value in texts)
+            if not occurrences:
+                continue  # bigram false positive
+            hits.append({
+                "doc_type": doc_type,
+                "doc_id": doc_id,
+                "key": doc_key,
+                "cfts_id": cfts_id or None,
+                "score": float(occurrences),
+                "snippet": next(
+                    _ngram_snippet(original, value, needle)
+                    for original, value in zip(originals, texts) if needle in value
+                ),
+            })
+        rows.close()
+
+    hits.sort(key=lambda hit: hit["score"], reverse=True)
+    return hits[:limit], truncated
@@ -0,0 +1,152 @@
+"""On-disk cache of generated Excel exports, keyed by data version and filters."""
+import os
+import hashlib
+import logging
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from .db.data_version import get_data_version
+from .db.database import read_session
+from .metrics import record_cache
+from .xlsx_export import SYS2_SHEET_TITLE, iter_sys2_export_batches, new_sys2_workbook, write_sys2_sheet
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CACHE_DIR = Path(os.getenv("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rtm_export_cache")))
+# Workbooks built concurrently; each build streams the whole table
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="xlsx-export")
+_lock = threading.Lock()
+_in_flight: Dict[Path, Future] = {}
+_CACHED_NAME = re.compile(r"^sys2-v(\d+)-[0-9a-f]+\.xlsx$")
+
+
+def sys2_export_key(version: int, cfts_ids: Optional[List[str]] = None) -> str:
+    """Cache key (also used as the ETag) for a SYS.2 workbook at a data version."""
+    filters = ",".join(sorted(set(cfts_ids or [])))
+    digest = hashlib.sha1(filters.encode("utf-8")).hexdigest()[:16]
+    return f"sys2-v{version}-{digest}"
+
+
+def _cached_version(path: Path) -> Optional[int]:
+    """Data version encoded in a cached workbook name (sys2-v<version>-<digest>.xlsx)."""
+    match = _CACHED_NAME.match(path.name)
+    return int(match.group(1)) if match else None
+
+
+def _build_sys2_workbook(path: Path, version: int, cfts_ids: Optional[List[str]]) -> Path:
+    """
+    Write the workbook to a temporary file, then move it into place atomically.
+
+    The data version is read again in the build session, in the same
+    transaction as the rows, and names the file: an import committed after
+    the request read its version yields a file of the newer version (the
+    returned path), never a workbook mislabelled with the older one.
+    """
+    started = time.perf_counter()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".building-", suffix=".xlsx")
+    os.close(fd)
+
+    db = read_session()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            # Version and rows from one snapshot
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        built_version = get_data_version(db)
+        path = path.parent / f"{sys2_export_key(built_version, cfts_ids)}.xlsx"
+        workbook = new_sys2_workbook()
+        row_count, _, _ = write_sys2_sheet(workbook, SYS2_SHEET_TITLE, iter_sys2_export_batches(db, cfts_ids))
+        workbook.save(tmp_name)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Built {path.name}: {row_count} rows in {time.perf_counter() - started:.1f} s")
+    _prune_old_versions(path)
+    return path
+
+
+def _prune_old_versions(built: Path) -> None:
+    """
+    Delete cached workbooks of versions lower than the newest one present.
+
+    A build that finishes after a newer one never removes the newer cache;
+    its own file is left for the next build to prune.
+    """
+    cached = [(path, _cached_version(path)) for path in EXPORT_CACHE_DIR.glob("sys2-v*.xlsx")]
+    newest = max((version for _, version in cached if version is not None), default=None)
+    for path, version in cached:
+        if version is not None and version < newest and path != built:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def open_sys2_workbook(version: int, cfts_ids: Optional[List[str]] = None) -> Tuple[int, BinaryIO]:
+    """
+    Get the SYS.2 workbook for a data version as an open file (blocking).
+
+    Holding the file open keeps it readable even if another worker prunes
+    it before the response is sent; a workbook pruned between the cache
+    lookup and the open is rebuilt once.
+
+    Returns:
+        (data version of the workbook, open binary file)
+    """
+    for attempt in range(2):
+        path = get_sys2_workbook(version, cfts_ids).result()
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            if attempt:
+                raise
+            continue
+        return _cached_version(path), f
+
+
+def get_sys2_workbook(version: int, cfts_ids: Optional[List[str]] = None) -> Future:
+    """
+    Get the cached SYS.2 workbook for a data version, building it if needed.
+
+    The build runs on a background worker; concurrent requests for the same
+    key share one build.
+
+    Returns:
+        Future resolving to the workbook path (named after the data version
+        it was built from, which may be newer than version)
+    """
+    path = EXPORT_CACHE_DIR / f"{sys2_export_key(version, cfts_ids)}.xlsx"
+
+    with _lock:
+        future = _in_flight.get(path)
+        if future is not None:
+            record_cache("sys2_xlsx", False)
+            return future
+
+        if path.exists():
+            record_cache("sys2_xlsx", True)
+            future = Future()
+            future.set_result(path)
+            return future
+
+        record_cache("sys2_xlsx", False)
+        future = _executor.submit(_build_sys2_workbook, path, version, cfts_ids)
+        _in_flight[path] = future
+
+    def _done(_):
+        with _lock:
+            _in_flight.pop(path, None)
+
+    future.add_done_callback(_done)
+    return future
@@ -0,0 +1,114 @@
+"""Background database probe whose cached result backs /health and /readiness."""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from .db.data_version import get_data_version
+from .db.database import engine, replica_router, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Seconds between probes
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+# A probe slower than this (seconds) counts as failed
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "3"))
+# Results older than this many intervals are reported as stale (probe stuck)
+HEALTH_STALE_INTERVALS = 3
+
+
+def pool_status() -> Optional[dict]:
+    """Connection pool usage (None for pools without a fixed size, e.g. NullPool)."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return None
+    size = pool.size()
+    checked_out = pool.checkedout()
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        # > 1 means overflow connections are in use
+        "saturation": round(checked_out / size, 3) if size else None,
+    }
+
+
+class DatabaseProbe:
+    """Latest result of the periodic ``SELECT 1`` / data-version probe."""
+
+    def __init__(self):
+        self.healthy: Optional[bool] = None  # None: not probed yet
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[datetime] = None
+        self.last_success: Optional[datetime] = None
+        self.data_version: Optional[int] = None
+        self._pending: Optional[asyncio.Future] = None
+
+    def probe_once(self) -> None:
+        """Run one probe (blocking; called on a worker thread)."""
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+            version = get_data_version(db)
+        finally:
+            db.close()
+        self.latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.data_version = version
+
+    async def run(self) -> None:
+        """Probe forever, every HEALTH_PROBE_INTERVAL seconds."""
+        while True:
+            try:
+                # A timed-out probe keeps its thread; never start a second one next to it
+                if self._pending is None or self._pending.done():
+                    self._pending = asyncio.ensure_future(asyncio.to_thread(self.probe_once))
+                await asyncio.wait_for(asyncio.shield(self._pending), HEALTH_PROBE_TIMEOUT)
+                self.healthy = True
+                self.last_error = None
+                self.last_success = datetime.now(timezone.utc)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.healthy is not False:
+                    logger.warning(f"Database health probe failed: {e!r}")
+                self.healthy = False
+                self.last_error = (
+                    f"probe timed out after {HEALTH_PROBE_TIMEOUT:g} s" if isinstance(e, asyncio.TimeoutError) else str(e)
+                )
+            self.last_checked = datetime.now(timezone.utc)
+            await asyncio.sleep(HEALTH_PROBE_INTERVAL)
+
+    @property
+    def stale(self) -> bool:
+        if self.last_checked is None:
+            return False
+        age = (datetime.now(timezone.utc) - self.last_checked).total_seconds()
+        return age > HEALTH_PROBE_INTERVAL * HEALTH_STALE_INTERVALS + HEALTH_PROBE_TIMEOUT
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.healthy) and not self.stale
+
+    def snapshot(self) -> dict:
+        """Cached probe state plus current pool usage (no database access)."""
+        return {
+            "database": "connected" if self.ok else ("unknown" if self.healthy is None else "disconnected"),
+            "latency_ms": self.latency_ms,
+            "last_error": self.last_error,
+            "last_checked": self.last_checked.isoformat() if self.last_checked else None,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "stale": self.stale,
+            "data_version": self.data_version,
+            "pool": pool_status(),
+            "replica": replica_router.status(),
+        }
+
+
+database_probe = DatabaseProbe()
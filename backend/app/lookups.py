@@ -0,0 +1,199 @@
+"""
+Lookup repository for the read-only endpoints.
+
+Each lookup is answered by the in-memory read model when it is loaded and
+by the database otherwise; both implementations return rows with the same
+attributes, so the handlers make one call and convert the result. Every
+lookup is traced, so spans show which side served a request.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from .db.database import read_session
+from .db.pagination import DEFAULT_PAGE_SIZE
+from .db.crud import (
+    get_cfts_requirements_by_cfts_id,
+    get_cfts_requirements_by_cfts_ids,
+    get_cfts_requirements_by_req_id,
+    get_requirement_by_req_id,
+    get_cfts_requirements_by_melco_id,
+    get_all_cfts_requirements,
+    get_cfts_catalog,
+    get_sys2_requirements_by_melco_id,
+    get_sys2_requirements_by_melco_ids,
+    get_sys2_requirements_page_by_cfts_id,
+    get_testcases_by_feature_ids,
+    get_testcases_page_by_feature_id,
+    get_trace_by_melco_id,
+    group_rows_by,
+)
+from .read_model import ReadModel, current_read_model
+from .tracing import traced
+
+# (rows, next_cursor) of a keyset page
+Page = Tuple[list, Optional[str]]
+
+
+class DatabaseLookups:
+    """Lookups answered by crud queries on a read session."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @traced()
+    def search_cfts(self, cfts_id: str) -> list:
+        return get_cfts_requirements_by_cfts_id(self.db, cfts_id)
+
+    @traced()
+    def cfts_by_cfts_ids(self, cfts_ids: List[str]) -> Dict[str, list]:
+        return group_rows_by(get_cfts_requirements_by_cfts_ids(self.db, cfts_ids), "cfts_id", cfts_ids)
+
+    @traced()
+    def search_req(self, req_id: str) -> Tuple[Optional[str], list]:
+        # Resolve the owning CFTS and fetch all of its requirements in one statement
+        rows = get_cfts_requirements_by_req_id(self.db, req_id)
+        return (rows[0].search_cfts_id if rows else None), rows
+
+    @traced()
+    def requirement_by_req_id(self, req_id: str):
+        return get_requirement_by_req_id(self.db, req_id)
+
+    @traced()
+    def cfts_by_melco_id(self, melco_id: str) -> list:
+        return get_cfts_requirements_by_melco_id(self.db, melco_id)
+
+    @traced()
+    def cfts_page(self, sort: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE,
+                  descending: bool = False) -> Page:
+        return get_all_cfts_requirements(self.db, sort=sort, cursor=cursor, limit=limit, descending=descending)
+
+    @traced()
+    def catalog(self) -> list:
+        return get_cfts_catalog(self.db)
+
+    @traced()
+    def sys2_by_melco_id(self, melco_id: str) -> list:
+        return get_sys2_requirements_by_melco_id(self.db, melco_id)
+
+    @traced()
+    def sys2_by_melco_ids(self, melco_ids: List[str]) -> Dict[str, list]:
+        return group_rows_by(get_sys2_requirements_by_melco_ids(self.db, melco_ids), "melco_id", melco_ids)
+
+    @traced()
+    def sys2_page_by_cfts_id(self, cfts_id: str, sort: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE,
+                             descending: bool = False) -> Page:
+        return get_sys2_requirements_page_by_cfts_id(
+            self.db, cfts_id, sort=sort, cursor=cursor, limit=limit, descending=descending
+        )
+
+    @traced()
+    def testcases_by_feature_ids(self, feature_ids: List[str]) -> Dict[str, list]:
+        return group_rows_by(get_testcases_by_feature_ids(self.db, feature_ids), "feature_id", feature_ids)
+
+    @traced()
+    def testcases_page_by_feature_id(self, feature_id: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE,
+                                     descending: bool = False) -> Page:
+        return get_testcases_page_by_feature_id(
+            self.db, feature_id, cursor=cursor, limit=limit, descending=descending
+        )
+
+    @traced()
+    def trace(self, melco_id: str) -> dict:
+        return get_trace_by_melco_id(self.db, melco_id)
+
+
+class ReadModelLookups:
+    """The same lookups answered from the in-memory read model (no database access)."""
+
+    def __init__(self, model: ReadModel):
+        self.model = model
+
+    @traced()
+    def search_cfts(self, cfts_id: str) -> list:
+        return self.model.search_cfts(cfts_id)
+
+    @traced()
+    def cfts_by_cfts_ids(self, cfts_ids: List[str]) -> Dict[str, list]:
+        return {cfts_id: self.model.cfts_by_cfts_id.get(cfts_id, []) for cfts_id in cfts_ids}
+
+    @traced()
+    def search_req(self, req_id: str) -> Tuple[Optional[str], list]:
+        search_cfts_id = self.model.owner_cfts_id(req_id)
+        if search_cfts_id is None:
+            return None, []
+        return search_cfts_id, self.model.cfts_with_cfts_id_prefix(search_cfts_id)
+
+    @traced()
+    def requirement_by_req_id(self, req_id: str):
+        matches = self.model.cfts_by_req_id.get(req_id)
+        return matches[0] if matches else None
+
+    @traced()
+    def cfts_by_melco_id(self, melco_id: str) -> list:
+        return self.model.cfts_by_melco_id.get(melco_id, [])
+
+    @traced()
+    def cfts_page(self, sort: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE,
+                  descending: bool = False) -> Page:
+        return self.model.cfts_pages[sort].page(cursor, limit, descending=descending)
+
+    @traced()
+    def catalog(self) -> list:
+        return self.model.catalog
+
+    @traced()
+    def sys2_by_melco_id(self, melco_id: str) -> list:
+        return self.model.sys2_by_melco_id.get(melco_id, [])
+
+    @traced()
+    def sys2_by_melco_ids(self, melco_ids: List[str]) -> Dict[str, list]:
+        return {melco_id: self.model.sys2_by_melco_id.get(melco_id, []) for melco_id in melco_ids}
+
+    @traced()
+    def sys2_page_by_cfts_id(self, cfts_id: str, sort: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE,
+                             descending: bool = False) -> Page:
+        pages = self.model.sys2_pages_by_cfts_id.get(cfts_id)
+        if pages is None:
+            return [], None
+        return pages[sort].page(cursor, limit, descending=descending)
+
+    @traced()
+    def testcases_by_feature_ids(self, feature_ids: List[str]) -> Dict[str, list]:
+        grouped = {}
+        for feature_id in feature_ids:
+            testcases = self.model.testcases_by_feature_id.get(feature_id)
+            grouped[feature_id] = testcases.records if testcases is not None else []
+        return grouped
+
+    @traced()
+    def testcases_page_by_feature_id(self, feature_id: str, cursor: Optional[str], limit: int = DEFAULT_PAGE_SIZE,
+                                     descending: bool = False) -> Page:
+        testcases = self.model.testcases_by_feature_id.get(feature_id)
+        if testcases is None:
+            return [], None
+        return testcases.page(cursor, limit, descending=descending)
+
+    @traced()
+    def trace(self, melco_id: str) -> dict:
+        return self.model.trace(melco_id)
+
+
+Lookups = Union[DatabaseLookups, ReadModelLookups]
+
+
+def get_lookups() -> Iterator[Lookups]:
+    """
+    Dependency: the read model lookups when the model is loaded, the database
+    lookups otherwise. A read session (and with it the replica routing) is
+    only opened for the database lookups.
+    """
+    model = current_read_model()
+    if model is not None:
+        yield ReadModelLookups(model)
+        return
+    db = read_session()
+    try:
+        yield DatabaseLookups(db)
+    finally:
+        db.close()
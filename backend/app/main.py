@@ -1,18 +1,71 @@
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from .api import requirements, sys2_requirements, testcases
-from .db.database import create_tables, engine
-# 導入所有模型以便 create_tables 知道它們
-from .models import cfts_db, sys2_requirement, testcase
+from fastapi.responses import JSONResponse, Response
+from .api import requirements, sys2_requirements, testcases, trace, search, export, admin
+from .db.database import wait_for_database, SessionLocal
+from .health import database_probe
+from .autocomplete import get_autocomplete_index
+from .read_model import READ_MODEL_ENABLED, reload_read_model, run_reloader
+from .db.pagination import NEXT_CURSOR_HEADER
+from .db.search import NGRAM_TRUNCATED_HEADER
+from .metrics import METRICS_CONTENT_TYPE, PrometheusMiddleware, render_metrics
+from .request_timing import RequestTimingMiddleware
+from .profiling import PROFILE_ID_HEADER, ProfilingMiddleware
+from .tracing import TracingMiddleware
+from . import slow_queries  # noqa: F401  註冊慢查詢記錄的 SQLAlchemy 事件
+# 導入所有模型以便 Base.metadata / ORM mapper 知道它們（資料表由 Alembic migration 建立）
+from .models import cfts_db, sys2_requirement, testcase, search_document, data_version
+import asyncio
 import os
+import logging
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Requirement Test Management API")
 
-# 啟動時建立資料庫表
+# 資料庫連上並完成預熱前，/readiness 回報 not ready
+app.state.db_ready = False
+
+
+def warm_up_caches():
+    """預先建立 autocomplete 索引（及啟用時的 in-memory read model），第一個請求不必等待"""
+    db = SessionLocal()
+    try:
+        get_autocomplete_index(db)
+    except Exception as e:
+        logger.warning(f"Autocomplete index warm-up failed: {e}")
+    finally:
+        db.close()
+
+    if READ_MODEL_ENABLED:
+        try:
+            reload_read_model(force=True)
+        except Exception as e:
+            logger.warning(f"Read model load failed, lookups use the database: {e}")
+
+
+async def connect_database():
+    await wait_for_database()
+    await asyncio.to_thread(warm_up_caches)
+    app.state.db_ready = True
+    if READ_MODEL_ENABLED:
+        # 資料版本變更時在背景重新載入 read model
+        await run_reloader()
+
+
+# 啟動時不等待資料庫：在背景以指數退避重試連線，worker 立即開始接收請求
+# 資料表結構由 `alembic upgrade head` 在部署時執行一次（不在每個 worker 啟動時檢查）
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    app.state.db_connect_task = asyncio.create_task(connect_database())
+    # 背景定期檢查資料庫，/health 與 /readiness 直接回傳快取結果
+    app.state.db_probe_task = asyncio.create_task(database_probe.run())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    app.state.db_connect_task.cancel()
+    app.state.db_probe_task.cancel()
 
 # 從環境變數讀取 CORS 設定
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3001")
@@ -24,12 +77,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, NGRAM_TRUNCATED_HEADER, PROFILE_ID_HEADER, "traceparent"],
 )
 
+# X-Profile: 1 時以取樣分析器剖析單一請求
+app.add_middleware(ProfilingMiddleware)
+
+# 每個請求的 SQL 次數 / DB 時間（Server-Timing header、N+1 警告）
+app.add_middleware(RequestTimingMiddleware)
+
+# 取樣的請求建立 trace span，並沿用 / 回傳 W3C traceparent
+app.add_middleware(TracingMiddleware)
+
+# 最外層：量測每個請求的延遲（含 CORS 處理）
+app.add_middleware(PrometheusMiddleware)
+
 app.include_router(requirements.router)
 app.include_router(requirements.req_router)
 app.include_router(sys2_requirements.router)
 app.include_router(testcases.router)
+app.include_router(trace.router)
+app.include_router(search.router)
+app.include_router(export.router)
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
@@ -38,47 +108,37 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health_check():
-    """健康檢查端點 - 檢查 API 和資料庫連接狀態"""
-    from sqlalchemy import text
-    try:
-        # 測試資料庫連接
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-
+    """健康檢查端點 - 回傳背景 DB probe 的最新結果（不佔用連線）"""
+    database = database_probe.snapshot()
+    if database_probe.ok:
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={
-                "status": "healthy",
-                "database": "connected",
-                "message": "All systems operational"
-            }
-        )
-    except Exception as e:
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={
-                "status": "unhealthy",
-                "database": "disconnected",
-                "error": str(e)
-            }
+            content={"status": "healthy", "message": "All systems operational", **database}
         )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "unhealthy", **database}
+    )
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    """Prometheus 指標端點 (text exposition format)"""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.get("/readiness", tags=["Health"])
 async def readiness_check():
-    """就緒檢查端點 - 檢查服務是否準備好接收請求"""
-    from sqlalchemy import text
-    try:
-        # 測試資料庫連接
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-
+    """就緒檢查端點 - 資料庫連線與預熱完成，且最近一次 DB probe 成功"""
+    database = database_probe.snapshot()
+    if app.state.db_ready and database_probe.ok:
         return JSONResponse(
             status_code=status.HTTP_200_OK,
-            content={"status": "ready"}
+            content={"status": "ready", **database}
         )
-    except Exception as e:
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={"status": "not ready", "error": str(e)}
-        )
\ No newline at end of file
+    if not app.state.db_ready:
+        database["database"] = "connecting"
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "not ready", **database}
+    )
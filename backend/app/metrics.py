@@ -0,0 +1,148 @@
+"""Prometheus metrics: HTTP latency per route, DB pool, caches and import state."""
+import time
+from datetime import timezone
+from typing import Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+# Latency buckets (seconds); the low end resolves index/cache hits
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "rtm_http_request_duration_seconds",
+    "HTTP request latency (until the last body byte is sent) by route template and status",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "rtm_http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+CACHE_REQUESTS = Counter(
+    "rtm_cache_requests_total",
+    "Cache lookups by cache and result (hit / miss)",
+    ["cache", "result"],
+)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one cache lookup."""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the matched route template (not the raw path)
+    to keep label cardinality bounded; labelled children are cached so a
+    request costs one dict lookup plus the histogram observe.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._children: Dict[Tuple[str, str, str], object] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else "<unmatched>", str(status_code))
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = HTTP_REQUEST_DURATION.labels(*key)
+            child.observe(elapsed)
+
+
+class DatabaseCollector:
+    """Collect connection pool usage and import state at scrape time."""
+
+    def describe(self):
+        # Skip the registration-time collect(), which would query the database on import
+        return []
+
+    def collect(self):
+        from .db.database import engine
+
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            pool_gauge = GaugeMetricFamily(
+                "rtm_db_pool_connections", "Database connection pool connections by state", labels=["state"]
+            )
+            pool_gauge.add_metric(["checked_out"], pool.checkedout())
+            pool_gauge.add_metric(["checked_in"], pool.checkedin())
+            pool_gauge.add_metric(["overflow"], max(pool.overflow(), 0))
+            yield pool_gauge
+            yield GaugeMetricFamily("rtm_db_pool_size", "Configured connection pool size", value=pool.size())
+
+        yield from self._import_metrics()
+
+    def _import_metrics(self):
+        from sqlalchemy import func, select
+        from .db.database import SessionLocal
+        from .models.cfts_db import CFTSCatalogDB
+        from .models.data_version import DataVersionDB
+
+        db = SessionLocal()
+        try:
+            version_row = db.execute(select(DataVersionDB.version, DataVersionDB.updated_at)).first()
+            totals = db.execute(select(
+                func.sum(CFTSCatalogDB.requirement_count),
+                func.sum(CFTSCatalogDB.sys2_count),
+                func.sum(CFTSCatalogDB.testcase_count),
+                func.count(),
+            )).one()
+        except Exception:
+            # 資料庫無法連線時只回報連線池指標
+            return
+        finally:
+            db.close()
+
+        yield GaugeMetricFamily(
+            "rtm_data_version", "Data version (incremented by every completed import)",
+            value=version_row.version if version_row else 0,
+        )
+        if version_row and version_row.updated_at:
+            updated_at = version_row.updated_at
+            if updated_at.tzinfo is None:
+                # SQLite 回傳不含時區的 UTC 時間
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            yield GaugeMetricFamily(
+                "rtm_last_import_timestamp_seconds", "Unix time of the last completed import",
+                value=updated_at.timestamp(),
+            )
+
+        rows = GaugeMetricFamily("rtm_imported_rows", "Imported rows per table (from cfts_catalog)", labels=["table"])
+        for table, count in zip(("cfts_requirements", "sys2_requirements", "testcases"), totals[:3]):
+            rows.add_metric([table], count or 0)
+        yield rows
+        yield GaugeMetricFamily("rtm_cfts_count", "CFTS in the catalog", value=totals[3])
+
+
+REGISTRY.register(DatabaseCollector())
+
+
+def render_metrics() -> bytes:
+    """Render all metrics in the Prometheus text exposition format."""
+    return generate_latest(REGISTRY)
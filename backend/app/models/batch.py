@@ -0,0 +1,11 @@
+"""Batch lookup models."""
+from pydantic import BaseModel, Field
+from typing import List
+
+# Upper bound on IDs per batch request (SQLite binds one parameter per ID)
+MAX_BATCH_IDS = 5000
+
+
+class BatchLookupRequest(BaseModel):
+    """IDs to resolve in one batch lookup."""
+    ids: List[str] = Field(..., max_length=MAX_BATCH_IDS)
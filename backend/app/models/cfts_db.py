@@ -1,11 +1,16 @@
 """CFTS Database models."""
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from ..db.database import Base
 
 
 class CFTSRequirementDB(Base):
     __tablename__ = "cfts_requirements"
+    __table_args__ = (
+        # Keyset pagination 排序索引 (GET /cfts/?sort=...)
+        Index("ix_cfts_requirements_cfts_id_req_id_id", "cfts_id", "req_id", "id"),
+        Index("ix_cfts_requirements_req_id_id", "req_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cfts_id = Column(String, index=True)
@@ -16,4 +21,32 @@ class CFTSRequirementDB(Base):
     sr24_description = Column(String, default="")  # SR24 Description
     melco_id = Column(String, default="")  # Melco ID
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class CFTSMelcoLinkDB(Base):
+    """Normalized CFTS requirement ↔ Melco ID link (one row per ID in cfts_requirements.melco_id)."""
+    __tablename__ = "cfts_melco_links"
+    __table_args__ = (
+        # 反查用索引：melco_id -> cfts_requirement_id（index-only lookup）
+        UniqueConstraint("melco_id", "cfts_requirement_id", name="uq_cfts_melco_links_melco_id_req"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    cfts_requirement_id = Column(
+        Integer, ForeignKey("cfts_requirements.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    melco_id = Column(String, nullable=False)  # 單一 Melco ID (例: PSCFTS016-1-4-2)
+
+
+class CFTSCatalogDB(Base):
+    """Per-CFTS catalog maintained by the importers (replaces DISTINCT scans)."""
+    __tablename__ = "cfts_catalog"
+
+    cfts_id = Column(String, primary_key=True)  # CFTS編號 (例: CFTS016)
+    cfts_name = Column(String, default="")  # CFTS名稱 (例: Anti-Theft)
+    source_file = Column(String, default="")  # 最後匯入的 CFTS Excel 檔名
+    requirement_count = Column(Integer, nullable=False, default=0)  # cfts_requirements 筆數
+    sys2_count = Column(Integer, nullable=False, default=0)  # sys2_requirements 筆數
+    testcase_count = Column(Integer, nullable=False, default=0)  # 對應 SYS.2 Melco ID 的 testcases 筆數
+    last_imported_at = Column(DateTime(timezone=True), server_default=func.now())
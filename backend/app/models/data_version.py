@@ -0,0 +1,13 @@
+"""Data version model."""
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.sql import func
+from ..db.database import Base
+
+
+class DataVersionDB(Base):
+    """Single-row counter bumped by every import; caches key on it."""
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
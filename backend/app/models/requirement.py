@@ -26,4 +26,17 @@ class CFTSSearchResult(BaseModel):
     target_req_id: Optional[str] = None  # For Req.ID search, indicates which row to highlight
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CFTSCatalogEntry(BaseModel):
+    cfts_id: str
+    cfts_name: Optional[str] = None
+    source_file: Optional[str] = None
+    requirement_count: int
+    sys2_count: int
+    testcase_count: int
+    last_imported_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
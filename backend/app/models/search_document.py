@@ -0,0 +1,69 @@
+"""Full-text search index models."""
+from sqlalchemy import Table, MetaData, Column, String, Integer, Text, DDL, event
+from pydantic import BaseModel
+from typing import Optional
+from ..db.database import Base
+
+# 全文檢索索引表：依資料庫不同而建立方式不同，所以不放在 Base.metadata
+# PostgreSQL: 一般資料表 + tsvector generated column + GIN index
+# SQLite:     FTS5 virtual table
+search_documents = Table(
+    "search_documents",
+    MetaData(),
+    Column("doc_type", String),  # cfts / sys2 / testcase
+    Column("doc_id", Integer),  # 來源資料表的 id
+    Column("doc_key", String),  # req_id / melco_id / feature_id
+    Column("cfts_id", String),
+    Column("content", Text),  # 合併後的全文內容
+)
+
+SEARCH_TS_CONFIG = "english"
+
+_postgresql_ddl = [
+    f"""
+    CREATE TABLE IF NOT EXISTS search_documents (
+        doc_type VARCHAR NOT NULL,
+        doc_id INTEGER NOT NULL,
+        doc_key VARCHAR,
+        cfts_id VARCHAR,
+        content TEXT,
+        search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('{SEARCH_TS_CONFIG}', coalesce(content, ''))) STORED,
+        PRIMARY KEY (doc_type, doc_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_vector ON search_documents USING GIN (search_vector)",
+]
+
+_sqlite_ddl = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5(
+        doc_type UNINDEXED, doc_id UNINDEXED, doc_key UNINDEXED, cfts_id UNINDEXED, content,
+        tokenize = 'porter unicode61'
+    )
+    """,
+]
+
+for _statement in _postgresql_ddl:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in _sqlite_ddl:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Base.metadata, "before_drop", DDL("DROP TABLE IF EXISTS search_documents"))
+
+
+class NGramPostingDB(Base):
+    """Bigram inverted index for CJK text (one row per distinct bigram per document)."""
+    __tablename__ = "ngram_postings"
+
+    gram = Column(String, primary_key=True)  # NFKC 正規化後的 2 字元片段
+    doc_type = Column(String, primary_key=True)  # sys2 / testcase
+    doc_id = Column(Integer, primary_key=True)  # 來源資料表的 id
+
+
+class SearchHit(BaseModel):
+    """One ranked full-text search hit."""
+    doc_type: str
+    doc_id: int
+    key: str
+    cfts_id: Optional[str] = None
+    score: float
+    snippet: str
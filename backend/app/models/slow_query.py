@@ -0,0 +1,17 @@
+"""Slow query log models."""
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class SlowQueryEntry(BaseModel):
+    """Aggregated slow executions of one statement, with the plan of the slowest run."""
+    statement: str
+    count: int
+    max_ms: float
+    total_ms: float
+    last_seen: datetime
+    worst_parameters: str
+    worst_at: datetime
+    plan: Optional[List[str]] = None
+    plan_error: Optional[str] = None
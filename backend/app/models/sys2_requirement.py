@@ -1,5 +1,6 @@
 """SYS.2 Requirement models."""
-from sqlalchemy import Column, String, DateTime, Integer, Text
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from ..db.database import Base
 from pydantic import BaseModel
@@ -10,6 +11,11 @@ from datetime import datetime
 class SYS2RequirementDB(Base):
     """SYS.2 Requirement database model."""
     __tablename__ = "sys2_requirements"
+    __table_args__ = (
+        # Keyset pagination 排序索引 (GET /sys2/by-cfts/{cfts_id}?sort=...)
+        Index("ix_sys2_requirements_cfts_id_melco_id_id", "cfts_id", "melco_id", "id"),
+        Index("ix_sys2_requirements_cfts_id_id", "cfts_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     melco_id = Column(String, index=True, unique=True)  # 要件ID (例: PSCFTS016-1-4-2)
@@ -26,10 +32,11 @@ class SYS2RequirementDB(Base):
     # 其他欄位
     type = Column(String, default="")  # 種別
     related_requirement_ids = Column(Text, default="")  # 関連要件ID
-    r1l_sr21cfts = Column(String, default="")  # (R1L_SR21CFTS)
-    r1l_sr22cfts = Column(String, default="")  # (R1L_SR22CFTS)
-    r1l_sr23cfts = Column(String, default="")  # (R1L_SR23CFTS)
-    r1l_sr24cfts = Column(String, default="")  # (R1L_SR24CFTS)
+    # 跨 CFTS 參考欄位只有匯出會用到，預設延遲載入 (undefer_group("cfts_refs"))
+    r1l_sr21cfts = deferred(Column(String, default=""), group="cfts_refs")  # (R1L_SR21CFTS)
+    r1l_sr22cfts = deferred(Column(String, default=""), group="cfts_refs")  # (R1L_SR22CFTS)
+    r1l_sr23cfts = deferred(Column(String, default=""), group="cfts_refs")  # (R1L_SR23CFTS)
+    r1l_sr24cfts = deferred(Column(String, default=""), group="cfts_refs")  # (R1L_SR24CFTS)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
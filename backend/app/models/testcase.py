@@ -1,5 +1,6 @@
 """TestCase models."""
-from sqlalchemy import Column, String, DateTime, Integer, Text
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from ..db.database import Base
 from pydantic import BaseModel
@@ -10,6 +11,10 @@ from datetime import datetime
 class TestCaseDB(Base):
     """TestCase database model."""
     __tablename__ = "testcases"
+    __table_args__ = (
+        # Keyset pagination 排序索引 (GET /testcases/by-feature-id/{feature_id})
+        Index("ix_testcases_feature_id_id", "feature_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     feature_id = Column(String, index=True)  # G欄: Feature-ID (對應Melco ID)
@@ -22,19 +27,19 @@ class TestCaseDB(Base):
     precondition_procedure_jp = Column(Text, default="")  # E欄: Precondition/Procedure(JP)
     criteria_jp = Column(Text, default="")  # F欄: Criteria(JP)
 
-    # 其他欄位（可選）
-    mp = Column(String, default="")  # H欄: MP
-    ds = Column(String, default="")  # I欄: DS
-    dt = Column(String, default="")  # J欄: DT
-    hdcc = Column(String, default="")  # K欄: HDCC
-    ru = Column(String, default="")  # L欄: RU
-    specification = Column(String, default="")  # M欄: Specification
-    priority = Column(String, default="")  # N欄: Priority
-    test_version = Column(String, default="")  # O欄: Test Version
-    test_result = Column(String, default="")  # P欄: Test Result
-    tester = Column(String, default="")  # Q欄: Tester
-    issue_id = Column(String, default="")  # R欄: Issue ID
-    note = Column(Text, default="")  # S欄: Note
+    # 其他欄位（可選，API 不回傳，預設延遲載入 (undefer_group("tracking"))）
+    mp = deferred(Column(String, default=""), group="tracking")  # H欄: MP
+    ds = deferred(Column(String, default=""), group="tracking")  # I欄: DS
+    dt = deferred(Column(String, default=""), group="tracking")  # J欄: DT
+    hdcc = deferred(Column(String, default=""), group="tracking")  # K欄: HDCC
+    ru = deferred(Column(String, default=""), group="tracking")  # L欄: RU
+    specification = deferred(Column(String, default=""), group="tracking")  # M欄: Specification
+    priority = deferred(Column(String, default=""), group="tracking")  # N欄: Priority
+    test_version = deferred(Column(String, default=""), group="tracking")  # O欄: Test Version
+    test_result = deferred(Column(String, default=""), group="tracking")  # P欄: Test Result
+    tester = deferred(Column(String, default=""), group="tracking")  # Q欄: Tester
+    issue_id = deferred(Column(String, default=""), group="tracking")  # R欄: Issue ID
+    note = deferred(Column(Text, default=""), group="tracking")  # S欄: Note
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
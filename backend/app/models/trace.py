@@ -0,0 +1,17 @@
+"""Traceability models."""
+from pydantic import BaseModel
+from typing import List
+from .requirement import CFTSRequirement
+from .sys2_requirement import SYS2RequirementDetail
+from .testcase import TestCaseResponse
+
+
+class TraceResult(BaseModel):
+    """SYS.2 requirements, test cases and referencing CFTS rows of one Melco ID."""
+    melco_id: str
+    sys2_requirements: List[SYS2RequirementDetail]
+    testcases: List[TestCaseResponse]
+    cfts_requirements: List[CFTSRequirement]
+
+    class Config:
+        from_attributes = True
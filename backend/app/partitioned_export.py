@@ -0,0 +1,197 @@
+"""Per-CFTS Excel export rendered in parallel worker processes."""
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, union
+
+from .db.crud import get_cfts_catalog
+from .db.database import SessionLocal, engine
+from .db.export import cfts_filter
+from .models.cfts_db import CFTSRequirementDB
+from .models.sys2_requirement import SYS2RequirementDB
+from .models.testcase import TestCaseDB
+from .xlsx_export import (
+    CFTS_COLORS,
+    CFTS_EXPORT_COLUMNS,
+    DEFAULT_CFTS_COLOR,
+    SYS2_EXPORT_COLUMNS,
+    TESTCASE_EXPORT_COLUMNS,
+    finish_sheet,
+    iter_column_batches,
+    new_sys2_workbook,
+    start_sheet,
+    write_table_sheet,
+)
+
+# dataset -> (工作表名稱, 欄位定義, 排序)
+PARTITION_DATASETS = {
+    "cfts": ("CFTS", CFTS_EXPORT_COLUMNS, (CFTSRequirementDB.req_id, CFTSRequirementDB.id)),
+    "sys2": ("SYS.2", SYS2_EXPORT_COLUMNS, (SYS2RequirementDB.melco_id,)),
+    "testcases": ("TestCase", TESTCASE_EXPORT_COLUMNS, (TestCaseDB.feature_id, TestCaseDB.id)),
+}
+
+EXPORT_MODES = ("zip", "sheets")
+
+
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def render_partition(cfts_id: str, dataset: str, out_path: str) -> int:
+    """
+    Render one (CFTS, dataset) partition into a single-sheet workbook.
+
+    Runs in a worker process.
+
+    Returns:
+        Number of data rows written
+    """
+    label, columns, order_by = PARTITION_DATASETS[dataset]
+    db = SessionLocal()
+    try:
+        workbook = new_sys2_workbook()
+        batches = iter_column_batches(db, columns, [cfts_filter(db, dataset, [cfts_id])], order_by)
+        row_count = write_table_sheet(
+            workbook, label, columns, batches, CFTS_COLORS.get(cfts_id, DEFAULT_CFTS_COLOR)
+        )
+        workbook.save(out_path)
+        return row_count
+    finally:
+        db.close()
+
+
+def assemble_workbook(sheets: List[Tuple[str, str, str, int]], output_path: Path) -> None:
+    """
+    Combine single-sheet workbooks from render_partition() into one workbook.
+
+    A skeleton workbook with the final sheet titles is written first, then
+    its (empty) sheet parts are swapped for the rendered ones. Styles resolve
+    to the same indices in every workbook (see start_sheet()), so the sheet
+    XML can be copied verbatim.
+
+    Args:
+        sheets: (title, dataset, rendered workbook path, row count) per sheet, in order
+        output_path: Workbook to write
+    """
+    skeleton = new_sys2_workbook()
+    for title, dataset, _, row_count in sheets:
+        columns = PARTITION_DATASETS[dataset][1]
+        finish_sheet(start_sheet(skeleton, title, columns), columns, row_count)
+
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+        skeleton_path = tmp.name
+    try:
+        skeleton.save(skeleton_path)
+        replacements = {
+            f"xl/worksheets/sheet{idx}.xml": part_path
+            for idx, (_, _, part_path, _) in enumerate(sheets, start=1)
+        }
+        with zipfile.ZipFile(skeleton_path) as src, \
+                zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                part_path = replacements.get(item.filename)
+                if part_path is None:
+                    dst.writestr(item, src.read(item.filename))
+                    continue
+                with zipfile.ZipFile(part_path) as part, \
+                        part.open("xl/worksheets/sheet1.xml") as sheet_xml, \
+                        dst.open(item.filename, "w") as out:
+                    shutil.copyfileobj(sheet_xml, out)
+    finally:
+        os.unlink(skeleton_path)
+
+
+def _partition_sizes(db, cfts_ids: Optional[List[str]]) -> Dict[str, Dict[str, int]]:
+    """Expected rows per CFTS and dataset (from cfts_catalog), used to schedule big partitions first."""
+    sizes = {
+        entry.cfts_id: {
+            "cfts": entry.requirement_count,
+            "sys2": entry.sys2_count,
+            "testcases": entry.testcase_count,
+        }
+        for entry in get_cfts_catalog(db)
+    }
+    if not sizes:
+        # 尚未建立 catalog 的舊資料庫
+        ids = union(select(CFTSRequirementDB.cfts_id), select(SYS2RequirementDB.cfts_id))
+        sizes = {cfts_id: {} for (cfts_id,) in db.execute(ids) if cfts_id}
+    if cfts_ids:
+        sizes = {cfts_id: sizes[cfts_id] for cfts_id in cfts_ids if cfts_id in sizes}
+    return sizes
+
+
+def export_by_cfts(output_path: Path, mode: str = "zip", cfts_ids: Optional[List[str]] = None,
+                   processes: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+    """
+    Export CFTS requirements, SYS.2 requirements and test cases partitioned by CFTS.
+
+    Every (CFTS, dataset) partition is rendered by a process pool, largest
+    first, so the total time is bounded by the number of cores rather than
+    the number of CFTS.
+
+    Args:
+        output_path: .zip (mode "zip") or .xlsx (mode "sheets") to write
+        mode: "zip" - one workbook per CFTS with CFTS / SYS.2 / TestCase sheets;
+              "sheets" - one workbook with those three sheets per CFTS
+        cfts_ids: Restrict to these CFTS IDs (default: all)
+        processes: Worker processes (default: CPU count)
+
+    Returns:
+        Rows written per CFTS ID and dataset
+    """
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode: {mode}")
+
+    db = SessionLocal()
+    try:
+        sizes = _partition_sizes(db, cfts_ids)
+    finally:
+        db.close()
+
+    partitions = sorted(
+        ((cfts_id, dataset) for cfts_id in sizes for dataset in PARTITION_DATASETS),
+        key=lambda p: sizes[p[0]].get(p[1], 0),
+        reverse=True,
+    )
+
+    workdir = Path(tempfile.mkdtemp(prefix="cfts_export_"))
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+            futures = {
+                (cfts_id, dataset): pool.submit(
+                    render_partition, cfts_id, dataset, str(workdir / f"{cfts_id}_{dataset}.xlsx")
+                )
+                for cfts_id, dataset in partitions
+            }
+            counts = {
+                cfts_id: {dataset: futures[(cfts_id, dataset)].result() for dataset in PARTITION_DATASETS}
+                for cfts_id in sorted(sizes)
+            }
+
+        def sheets_for(cfts_id: str, prefix: str = ""):
+            return [
+                (f"{prefix}{PARTITION_DATASETS[dataset][0]}", dataset,
+                 str(workdir / f"{cfts_id}_{dataset}.xlsx"), counts[cfts_id][dataset])
+                for dataset in PARTITION_DATASETS
+            ]
+
+        if mode == "sheets":
+            assemble_workbook(
+                [sheet for cfts_id in counts for sheet in sheets_for(cfts_id, f"{cfts_id} ")],
+                output_path,
+            )
+        else:
+            with zipfile.ZipFile(output_path, "w", zipfile.ZIP_STORED) as archive:
+                for cfts_id in counts:
+                    workbook_path = workdir / f"{cfts_id}.xlsx"
+                    assemble_workbook(sheets_for(cfts_id), workbook_path)
+                    archive.write(workbook_path, f"{cfts_id}.xlsx")
+        return counts
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,184 @@
+"""On-demand sampling profiler for single requests (collapsed-stack / flame graph output)."""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
+
+from .security import admin_token_ok
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "rtm_profiles")))
+# Sampling interval (seconds)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+# Profiles kept on disk; the oldest are deleted first
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
+
+
+class SamplingProfiler:
+    """
+    Background thread sampling the stacks of the threads serving one request.
+
+    The event loop thread is sampled for the whole request; threadpool
+    threads are added while they run the request's sync endpoint (see
+    track_current_thread()). Output is the collapsed-stack format read by
+    flamegraph.pl, inferno and speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.thread_ids = {threading.get_ident()}
+        self.stacks = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[_collapse(frame)] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    marker = f"{os.sep}site-packages{os.sep}"
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+_active: ContextVar[Optional[SamplingProfiler]] = ContextVar("request_profiler", default=None)
+
+
+@contextmanager
+def track_current_thread():
+    """Include the current (threadpool) thread in the request's profile, if one is running."""
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler.thread_ids.add(thread_id)
+    try:
+        yield
+    finally:
+        profiler.thread_ids.discard(thread_id)
+
+
+def _store_profile(profiler: SamplingProfiler, method: str, path: str, elapsed: float) -> str:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    header = (
+        f"# {method} {path} {elapsed * 1000:.1f} ms, {profiler.sample_count} samples "
+        f"every {profiler.interval * 1000:g} ms\n"
+    )
+    (PROFILE_DIR / f"{profile_id}.collapsed").write_text(header + profiler.collapsed(), encoding="utf-8")
+
+    for old in _stored_profiles()[PROFILE_KEEP:]:
+        old.unlink(missing_ok=True)
+    return profile_id
+
+
+def _stored_profiles() -> List[Path]:
+    return sorted(PROFILE_DIR.glob("*.collapsed"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def list_profiles() -> List[str]:
+    """Stored profile IDs, newest first."""
+    return [path.stem for path in _stored_profiles()]
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Path of a stored profile (None for unknown or malformed IDs)."""
+    path = PROFILE_DIR / f"{profile_id}.collapsed"
+    if path.parent != PROFILE_DIR or not path.is_file():
+        return None
+    return path
+
+
+class ProfilingMiddleware:
+    """
+    Profile a request when it carries ``X-Profile: 1`` and the admin token.
+
+    The header is ignored while no ADMIN_TOKEN is configured. The profile is
+    stored under PROFILE_DIR and its ID returned in the X-Profile-Id
+    response header. Requests without the header only pay for the header scan.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        flag = token = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                flag = value
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        if flag is None or flag in (b"0", b"") or not admin_token_ok(token):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = SamplingProfiler()
+        stored = {}
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                # 回應標頭送出前先停止取樣並儲存，才能回傳 profile ID
+                stored["id"] = await asyncio.to_thread(finish)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode("latin-1"), stored["id"].encode("latin-1"))
+                ]
+            await send(message)
+
+        started = time.perf_counter()
+
+        def finish():
+            # Joins the sampler thread and writes/prunes files: run off the event loop
+            profiler.stop()
+            return _store_profile(profiler, scope["method"], scope["path"], time.perf_counter() - started)
+
+        token_ctx = _active.set(profiler)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _active.reset(token_ctx)
+            if "id" not in stored:
+                await asyncio.to_thread(finish)
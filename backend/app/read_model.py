@@ -0,0 +1,322 @@
+"""
+Optional in-memory read model serving the lookup endpoints without database access.
+
+The three data tables (projected to their response columns) and the CFTS
+catalog are loaded into ``__slots__`` records with hash indexes on cfts_id,
+req_id, melco_id and feature_id. A background task reloads the model when
+the data version changes and swaps it in atomically; requests only read the
+current model reference. Full-text search and exports still use the database.
+
+With READ_MODEL_SNAPSHOT set, the model is not built per worker but mapped
+from the snapshot file the importers publish (see read_snapshot.py).
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .db.crud import split_melco_ids
+from .db.data_version import get_data_version
+from .db.database import read_session
+from .db.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
+from .models.cfts_db import CFTSCatalogDB, CFTSRequirementDB
+from .models.requirement import CFTSCatalogEntry, CFTSRequirement
+from .models.sys2_requirement import SYS2RequirementDB, SYS2RequirementDetail
+from .models.testcase import TestCaseDB, TestCaseResponse
+
+logger = logging.getLogger(__name__)
+
+READ_MODEL_ENABLED = os.getenv("READ_MODEL_ENABLED", "false").lower() == "true"
+# Seconds between data version checks of the background reloader
+READ_MODEL_RECHECK_SECONDS = float(os.getenv("READ_MODEL_RECHECK_SECONDS", "5"))
+# Snapshot file published by the importers (see read_snapshot.py); when set, workers
+# map it instead of each loading its own copy from the database
+READ_MODEL_SNAPSHOT = os.getenv("READ_MODEL_SNAPSHOT", "")
+
+
+def _record_class(name: str, fields: Sequence[str]):
+    """Build a compact record class (``__slots__``, positional constructor) for a row shape."""
+    def __init__(self, *values):
+        for field, value in zip(fields, values):
+            setattr(self, field, value)
+
+    return type(name, (), {"__slots__": tuple(fields), "__init__": __init__})
+
+
+# id first, then the response model fields (same projection as the database queries)
+CFTSRecord = _record_class("CFTSRecord", ("id", *CFTSRequirement.model_fields))
+SYS2Record = _record_class("SYS2Record", ("id", *SYS2RequirementDetail.model_fields))
+TestCaseRecord = _record_class("TestCaseRecord", ("id", *TestCaseResponse.model_fields))
+CatalogRecord = _record_class("CatalogRecord", tuple(CFTSCatalogEntry.model_fields))
+
+
+# Keyset orders of the paginated lists (same columns as the keyset_page() sort orders)
+CFTS_SORT_KEYS = {"cfts_id": ("cfts_id", "req_id", "id"), "req_id": ("req_id", "id"), "id": ("id",)}
+SYS2_SORT_KEYS = {"melco_id": ("melco_id", "id"), "id": ("id",)}
+TESTCASE_SORT_KEYS = {"id": ("id",)}
+
+
+def sort_key(fields: Sequence[str]) -> Callable[[object], Tuple]:
+    """Key function for a keyset order given by its record fields."""
+    return lambda record: tuple(getattr(record, field) for field in fields)
+
+
+class SortedRecords:
+    """Records in one keyset order, answering the same pages (and cursors) as keyset_page()."""
+    __slots__ = ("sort", "key_length", "keys", "records")
+
+    def __init__(self, sort: str, keys: Sequence[Tuple], records: Sequence, key_length: int):
+        # keys[i] is the sort key of records[i]; both in ascending key order
+        self.sort = sort
+        self.keys = keys
+        self.records = records
+        self.key_length = key_length
+
+    @classmethod
+    def build(cls, sort: str, records: list, fields: Sequence[str]) -> "SortedRecords":
+        """Sort records by the given fields (skipping, like keyset_page(), rows with a NULL sort key)."""
+        key = sort_key(fields)
+        pairs = sorted(
+            ((k, record) for k, record in ((key(record), record) for record in records) if None not in k),
+            key=lambda pair: pair[0],
+        )
+        return cls(sort, [pair[0] for pair in pairs], [pair[1] for pair in pairs], len(fields))
+
+    def page(self, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+             descending: bool = False) -> Tuple[list, Optional[str]]:
+        """
+        Get the page after the cursor position (before it, when descending).
+
+        Raises:
+            ValueError: on an invalid cursor
+        """
+        position = None
+        if cursor:
+            position = tuple(decode_cursor(self.sort, cursor, self.key_length))
+
+        try:
+            return self._page(position, limit, descending)
+        except TypeError:
+            # Cursor values of the wrong type (hand-made token)
+            raise ValueError("Invalid cursor")
+
+    def _page(self, position: Optional[Tuple], limit: int, descending: bool) -> Tuple[list, Optional[str]]:
+        keys = self.keys
+        if descending:
+            end = bisect_left(keys, position) if position is not None else len(keys)
+            start = max(end - limit, 0)
+            rows = self.records[start:end][::-1]
+            has_more, last = start > 0, start
+        else:
+            start = bisect_right(keys, position) if position is not None else 0
+            end = min(start + limit, len(keys))
+            rows = self.records[start:end]
+            has_more, last = end < len(keys), end - 1
+        return rows, (encode_cursor(self.sort, keys[last]) if rows and has_more else None)
+
+
+class ReadModel:
+    """Immutable snapshot of the lookup data for one data version."""
+    __slots__ = (
+        "version", "cfts", "sys2", "testcases", "cfts_ids", "cfts_by_cfts_id", "cfts_by_req_id", "cfts_by_melco_id",
+        "cfts_pages", "sys2_by_melco_id", "sys2_pages_by_cfts_id", "testcases_by_feature_id",
+        "catalog",
+    )
+
+    def __init__(self, version: int, cfts: list, sys2: list, testcases: list, catalog: list):
+        self.version = version
+        self.cfts = cfts
+        self.sys2 = sys2
+        self.testcases = testcases
+        self.catalog = catalog
+
+        self.cfts_by_cfts_id = _group(cfts, lambda r: r.cfts_id)
+        # Sorted distinct CFTS IDs for the prefix (LIKE 'x%') searches
+        self.cfts_ids = sorted(cfts_id for cfts_id in self.cfts_by_cfts_id if cfts_id is not None)
+        self.cfts_by_req_id = _group(cfts, lambda r: r.req_id)
+        self.cfts_by_melco_id = defaultdict(list)
+        for record in cfts:
+            for melco_id in split_melco_ids(record.melco_id):
+                self.cfts_by_melco_id[melco_id].append(record)
+        self.cfts_by_melco_id = dict(self.cfts_by_melco_id)
+        self.cfts_pages = {
+            sort: SortedRecords.build(sort, cfts, fields) for sort, fields in CFTS_SORT_KEYS.items()
+        }
+
+        self.sys2_by_melco_id = _group(sys2, lambda r: r.melco_id)
+        self.sys2_pages_by_cfts_id = {
+            cfts_id: {
+                sort: SortedRecords.build(sort, records, fields) for sort, fields in SYS2_SORT_KEYS.items()
+            }
+            for cfts_id, records in _group(sys2, lambda r: r.cfts_id).items()
+        }
+
+        self.testcases_by_feature_id = {
+            feature_id: SortedRecords.build("id", records, TESTCASE_SORT_KEYS["id"])
+            for feature_id, records in _group(testcases, lambda r: r.feature_id).items()
+        }
+
+    @classmethod
+    def load(cls, db: Session, version: int) -> "ReadModel":
+        """Load all lookup data (response columns only) ordered by id."""
+        def rows(db_model, record_class):
+            columns = [getattr(db_model, name) for name in record_class.__slots__]
+            return [record_class(*row) for row in db.execute(select(*columns).order_by(db_model.id))]
+
+        catalog_columns = [getattr(CFTSCatalogDB, name) for name in CatalogRecord.__slots__]
+        catalog = [
+            CatalogRecord(*row)
+            for row in db.execute(select(*catalog_columns).order_by(CFTSCatalogDB.cfts_id))
+        ]
+        return cls(
+            version,
+            rows(CFTSRequirementDB, CFTSRecord),
+            rows(SYS2RequirementDB, SYS2Record),
+            rows(TestCaseDB, TestCaseRecord),
+            catalog,
+        )
+
+    def cfts_with_cfts_id_prefix(self, prefix: str) -> list:
+        """CFTS requirements whose CFTS ID starts with prefix (LIKE 'prefix%'), ordered by id."""
+        start = bisect_left(self.cfts_ids, prefix)
+        matched = []
+        for position in range(start, len(self.cfts_ids)):
+            key = self.cfts_ids[position]
+            if not key.startswith(prefix):
+                break
+            matched.append(self.cfts_by_cfts_id[key])
+        if len(matched) == 1:
+            return list(matched[0])
+        return sorted((record for group in matched for record in group), key=lambda r: r.id)
+
+    def search_cfts(self, cfts_id: str) -> list:
+        """Same matching as crud.cfts_id_filter: exact for IDs ending in '-', prefix otherwise."""
+        if cfts_id.endswith('-'):
+            return list(self.cfts_by_cfts_id.get(cfts_id, ()))
+        return self.cfts_with_cfts_id_prefix(cfts_id)
+
+    def owner_cfts_id(self, req_id: str) -> Optional[str]:
+        """CFTS ID of the first (lowest id) requirement with this Req.ID."""
+        records = self.cfts_by_req_id.get(req_id)
+        return records[0].cfts_id if records else None
+
+    def trace(self, melco_id: str) -> dict:
+        """Traceability record of a Melco ID (same shape as crud.get_trace_by_melco_id)."""
+        testcases = self.testcases_by_feature_id.get(melco_id)
+        return {
+            "melco_id": melco_id,
+            "sys2_requirements": self.sys2_by_melco_id.get(melco_id, []),
+            "testcases": testcases.records if testcases is not None else [],
+            "cfts_requirements": self.cfts_by_melco_id.get(melco_id, []),
+        }
+
+
+def _group(records: list, key: Callable[[object], Optional[str]]) -> Dict[str, list]:
+    """Hash index: key -> records (keeping the id order of the input)."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[key(record)].append(record)
+    return dict(groups)
+
+
+_model: Optional[ReadModel] = None
+# Latest mapped snapshot (served only while it is not behind the database)
+_snapshot: Optional[ReadModel] = None
+_reload_lock = threading.Lock()
+
+
+def current_read_model() -> Optional[ReadModel]:
+    """The loaded read model, or None when disabled or not loaded yet (callers use the database)."""
+    return _model
+
+
+def reload_read_model(force: bool = False) -> Optional[ReadModel]:
+    """
+    Load a new read model if the data version changed, and swap it in.
+
+    Blocking; runs on a worker thread. The previous model keeps serving
+    while the new one is built (and if loading fails).
+    """
+    global _model
+
+    with _reload_lock:
+        if READ_MODEL_SNAPSHOT:
+            return _reload_snapshot(force)
+
+        db = read_session()
+        try:
+            version = get_data_version(db)
+            if not force and _model is not None and _model.version == version:
+                return _model
+            started = time.perf_counter()
+            model = ReadModel.load(db, version)
+        finally:
+            db.close()
+
+        _model = model
+        logger.info(
+            f"Read model loaded for data version {version}: {len(model.cfts)} CFTS requirements, "
+            f"{len(model.sys2)} SYS.2 requirements, {len(model.testcases)} test cases "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return model
+
+
+def _reload_snapshot(force: bool) -> Optional[ReadModel]:
+    """Map a newly published snapshot file, and serve it unless the database is ahead of it."""
+    from .read_snapshot import SnapshotReadModel, snapshot_file_id
+
+    global _model, _snapshot
+
+    file_id = snapshot_file_id(READ_MODEL_SNAPSHOT)
+    if file_id is not None and (force or _snapshot is None or _snapshot.file_id != file_id):
+        started = time.perf_counter()
+        _snapshot = SnapshotReadModel(READ_MODEL_SNAPSHOT)
+        logger.info(
+            f"Read model snapshot {READ_MODEL_SNAPSHOT} mapped: data version {_snapshot.version}, "
+            f"{len(_snapshot.cfts)} CFTS requirements, {len(_snapshot.sys2)} SYS.2 requirements, "
+            f"{len(_snapshot.testcases)} test cases in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+    if _snapshot is None:
+        if force:
+            logger.warning(f"Read model snapshot {READ_MODEL_SNAPSHOT} not found, lookups use the database")
+        return None
+
+    db = read_session()
+    try:
+        version = get_data_version(db)
+    except Exception as e:
+        # Database unreachable: the snapshot is the best data available
+        logger.warning(f"Data version check failed, serving snapshot version {_snapshot.version}: {e}")
+        version = None
+    finally:
+        db.close()
+
+    if version is not None and _snapshot.version < version:
+        if _model is not None:
+            logger.warning(
+                f"Read model snapshot (version {_snapshot.version}) is behind the database "
+                f"(version {version}), lookups use the database until a new snapshot is published"
+            )
+        _model = None
+    else:
+        _model = _snapshot
+    return _model
+
+
+async def run_reloader() -> None:
+    """Check the data version every READ_MODEL_RECHECK_SECONDS and reload on change."""
+    while True:
+        await asyncio.sleep(READ_MODEL_RECHECK_SECONDS)
+        try:
+            await asyncio.to_thread(reload_read_model)
+        except Exception as e:
+            logger.warning(f"Read model reload failed (still serving version "
+                           f"{_model.version if _model else None}): {e}")
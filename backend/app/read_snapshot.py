@@ -0,0 +1,421 @@
+"""
+Memory-mapped read model snapshot shared by all API workers.
+
+The importers write the read model of a data version to one immutable file
+(string table, fixed-width row arrays and sorted key indexes) and publish it
+with an atomic rename. Workers ``mmap`` the file read-only, so every process
+shares the same page-cache pages and only decodes the records a request
+returns; per-worker memory no longer grows with the data.
+
+File layout (native byte order)::
+
+    b"RTMSNAP\\0" | u64 header length | JSON header | sections (8-byte aligned)
+
+The header lists the tables (fields, value kinds, row count) and the byte
+range and array type code of every section.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from .db.data_version import get_data_version
+from .models.cfts_db import CFTSCatalogDB, CFTSRequirementDB
+from .models.sys2_requirement import SYS2RequirementDB
+from .models.testcase import TestCaseDB
+from .read_model import (
+    CFTS_SORT_KEYS, SYS2_SORT_KEYS, TESTCASE_SORT_KEYS,
+    CatalogRecord, CFTSRecord, ReadModel, SortedRecords, SYS2Record, TestCaseRecord,
+)
+
+MAGIC = b"RTMSNAP\0"
+FORMAT_VERSION = 2
+ALIGNMENT = 8
+# Row value of NULL (string, integer and timestamp columns alike)
+NULL = -2 ** 31
+
+# table -> (record class, database model)
+TABLES = {
+    "cfts": (CFTSRecord, CFTSRequirementDB),
+    "sys2": (SYS2Record, SYS2RequirementDB),
+    "testcases": (TestCaseRecord, TestCaseDB),
+    "catalog": (CatalogRecord, CFTSCatalogDB),
+}
+
+
+def _value_kind(db_model, field: str) -> str:
+    """'i' integer, 't' timestamp (stored as ISO string), 's' string."""
+    python_type = getattr(db_model, field).type.python_type
+    if python_type is int:
+        return "i"
+    if python_type is datetime:
+        return "t"
+    return "s"
+
+
+class _StringTableBuilder:
+    """Deduplicated UTF-8 strings, addressed by index."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def add(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.offsets) - 1
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return position
+
+
+def _encode_value(strings: _StringTableBuilder, kind: str, value) -> int:
+    if value is None:
+        return NULL
+    if kind == "i":
+        if not NULL < value < 2 ** 31:
+            raise ValueError(f"Integer {value} does not fit the snapshot format")
+        return value
+    return strings.add(value.isoformat() if kind == "t" else value)
+
+
+def write_snapshot(model: ReadModel, path: str) -> None:
+    """
+    Write a read model to path, replacing any previous snapshot atomically.
+
+    The file is written next to path and renamed over it, so workers only
+    ever see a complete snapshot (mapped old files stay valid until unmapped).
+    """
+    strings = _StringTableBuilder()
+    sections: Dict[str, object] = {}
+    tables = {}
+    rows_of: Dict[str, Dict[int, int]] = {}
+
+    table_records = {"cfts": model.cfts, "sys2": model.sys2, "testcases": model.testcases, "catalog": model.catalog}
+    for name, (record_class, db_model) in TABLES.items():
+        fields = record_class.__slots__
+        kinds = "".join(_value_kind(db_model, field) for field in fields)
+        values = array("i")
+        for record in table_records[name]:
+            values.extend(_encode_value(strings, kind, getattr(record, field)) for field, kind in zip(fields, kinds))
+        tables[name] = {"fields": list(fields), "kinds": kinds, "rows": len(table_records[name])}
+        sections[f"{name}.rows"] = values
+        rows_of[name] = {id(record): row for row, record in enumerate(table_records[name])}
+
+    def positions(table: str, records: Sequence) -> array:
+        return array("i", (rows_of[table][id(record)] for record in records))
+
+    def add_index(name: str, table: str, orders: Dict[str, Dict[Optional[str], Sequence]]) -> None:
+        # orders: sort -> key -> records of the key in that order (the first order names the key
+        # set); group sizes can differ per order, as rows with a NULL sort key are left out
+        keys = sorted((key for key in next(iter(orders.values())) if key is not None), key=lambda k: k.encode("utf-8"))
+        sections[f"{name}.keys"] = array("i", (strings.add(key) for key in keys))
+        for sort, groups in orders.items():
+            rows, starts = array("i"), array("i", [0])
+            for key in keys:
+                rows.extend(positions(table, groups[key]))
+                starts.append(len(rows))
+            sections[f"{name}.rows.{sort}"] = rows
+            sections[f"{name}.starts.{sort}"] = starts
+
+    add_index("cfts.by_cfts_id", "cfts", {"id": model.cfts_by_cfts_id})
+    add_index("cfts.by_req_id", "cfts", {"id": model.cfts_by_req_id})
+    add_index("cfts.by_melco_id", "cfts", {"id": model.cfts_by_melco_id})
+    add_index("sys2.by_melco_id", "sys2", {"id": model.sys2_by_melco_id})
+    add_index("sys2.by_cfts_id", "sys2", {
+        sort: {cfts_id: pages[sort].records for cfts_id, pages in model.sys2_pages_by_cfts_id.items()}
+        for sort in SYS2_SORT_KEYS
+    })
+    add_index("testcases.by_feature_id", "testcases", {
+        "id": {feature_id: testcases.records for feature_id, testcases in model.testcases_by_feature_id.items()}
+    })
+    for sort in CFTS_SORT_KEYS:
+        sections[f"cfts.order.{sort}"] = positions("cfts", model.cfts_pages[sort].records)
+
+    sections["strings.offsets"] = strings.offsets
+    sections["strings.data"] = array("B", strings.data)
+
+    layout, offset = {}, 0
+    for name, values in sections.items():
+        size = len(values) * values.itemsize
+        layout[name] = [offset, size, values.typecode]
+        offset += size + (-size % ALIGNMENT)
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "data_version": model.version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "tables": tables,
+        "sections": layout,
+    }).encode("utf-8")
+    prefix = MAGIC + struct.pack("<Q", len(header)) + header
+    prefix += b"\0" * (-len(prefix) % ALIGNMENT)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(prefix)
+            for values in sections.values():
+                size = len(values) * values.itemsize
+                f.write(values.tobytes())
+                f.write(b"\0" * (-size % ALIGNMENT))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def build_snapshot(db: Session, path: str) -> int:
+    """
+    Load the read model from the database and publish it as a snapshot.
+
+    Returns:
+        The data version of the snapshot
+    """
+    model = ReadModel.load(db, get_data_version(db))
+    write_snapshot(model, path)
+    return model.version
+
+
+class _Strings:
+    __slots__ = ("offsets", "data")
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def raw(self, index: int) -> memoryview:
+        return self.data[self.offsets[index]:self.offsets[index + 1]]
+
+    def get(self, index: int) -> str:
+        return str(self.raw(index), "utf-8")
+
+
+class _Table:
+    """Fixed-width row array of one table; values are decoded on access."""
+    __slots__ = ("record_class", "fields", "kinds", "width", "values", "strings")
+
+    def __init__(self, record_class, fields: Sequence[str], kinds: str, values: memoryview, strings: _Strings):
+        self.record_class = record_class
+        self.fields = list(fields)
+        self.kinds = kinds
+        self.width = len(fields)
+        self.values = values
+        self.strings = strings
+
+    def value(self, row: int, column: int):
+        raw = self.values[row * self.width + column]
+        if raw == NULL:
+            return None
+        kind = self.kinds[column]
+        if kind == "i":
+            return raw
+        text = self.strings.get(raw)
+        return datetime.fromisoformat(text) if kind == "t" else text
+
+    def record(self, row: int):
+        return self.record_class(*[self.value(row, column) for column in range(self.width)])
+
+    def columns(self, fields: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self.fields.index(field) for field in fields)
+
+
+class _Rows:
+    """Read-only sequence of records at the given row positions (decoded lazily)."""
+    __slots__ = ("table", "positions")
+
+    def __init__(self, table: _Table, positions: Sequence[int]):
+        self.table = table
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.table.record(row) for row in self.positions[index]]
+        return self.table.record(self.positions[index])
+
+    def __iter__(self):
+        record = self.table.record
+        return (record(row) for row in self.positions)
+
+
+class _Keys:
+    """Sort keys of the rows at the given positions (for bisect in SortedRecords.page())."""
+    __slots__ = ("table", "positions", "columns")
+
+    def __init__(self, table: _Table, positions: Sequence[int], columns: Tuple[int, ...]):
+        self.table = table
+        self.positions = positions
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index: int) -> Tuple:
+        row = self.positions[index]
+        return tuple(self.table.value(row, column) for column in self.columns)
+
+
+class _KeyBytes:
+    __slots__ = ("strings", "keys")
+
+    def __init__(self, strings: _Strings, keys: memoryview):
+        self.strings = strings
+        self.keys = keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.strings.raw(self.keys[index]).tobytes()
+
+
+class _Index:
+    """Sorted string keys, each with its rows in one or more orders."""
+    __slots__ = ("table", "keys", "starts", "rows")
+
+    def __init__(self, table: _Table, keys: memoryview, starts: Dict[str, memoryview], rows: Dict[str, memoryview]):
+        self.table = table
+        self.keys = _KeyBytes(table.strings, keys)
+        self.starts = starts
+        self.rows = rows
+
+    def find(self, key: str) -> Optional[int]:
+        encoded = key.encode("utf-8")
+        group = bisect_left(self.keys, encoded)
+        return group if group < len(self.keys) and self.keys[group] == encoded else None
+
+    def prefix_groups(self, prefix: str) -> range:
+        # UTF-8 preserves code point order, so a string prefix is a byte prefix
+        encoded = prefix.encode("utf-8")
+        start = end = bisect_left(self.keys, encoded)
+        while end < len(self.keys) and self.keys[end].startswith(encoded):
+            end += 1
+        return range(start, end)
+
+    def positions(self, group: int, sort: str = "id") -> memoryview:
+        starts = self.starts[sort]
+        return self.rows[sort][starts[group]:starts[group + 1]]
+
+
+class _IndexView:
+    """Dict-like ``get()`` over an index, building the value of a key with make(group)."""
+    __slots__ = ("index", "make")
+
+    def __init__(self, index: _Index, make: Callable[[int], object]):
+        self.index = index
+        self.make = make
+
+    def get(self, key: str, default=None):
+        group = self.index.find(key)
+        return default if group is None else self.make(group)
+
+
+def snapshot_file_id(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """Identity of the file currently at path (changes on every publish), None if missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class SnapshotReadModel(ReadModel):
+    """ReadModel with the same lookups, answered from a memory-mapped snapshot file."""
+    __slots__ = ("path", "file_id", "created_at", "cfts_id_index")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.file_id = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a read model snapshot")
+        header_length, = struct.unpack_from("<Q", buffer, len(MAGIC))
+        header_end = len(MAGIC) + 8 + header_length
+        header = json.loads(bytes(buffer[len(MAGIC) + 8:header_end]))
+        if header["format"] != FORMAT_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError(
+                f"Unsupported snapshot format {header['format']} ({header['byteorder']}-endian) in {path}"
+            )
+        data_start = header_end + (-header_end % ALIGNMENT)
+        view = memoryview(buffer)
+
+        def section(name: str) -> memoryview:
+            offset, size, typecode = header["sections"][name]
+            return view[data_start + offset:data_start + offset + size].cast(typecode)
+
+        self.version = header["data_version"]
+        self.created_at = header["created_at"]
+        strings = _Strings(section("strings.offsets"), section("strings.data"))
+        tables = {
+            name: _Table(TABLES[name][0], spec["fields"], spec["kinds"], section(f"{name}.rows"), strings)
+            for name, spec in header["tables"].items()
+        }
+
+        def index(name: str, table: str, sorts: Sequence[str] = ("id",)) -> _Index:
+            return _Index(tables[table], section(f"{name}.keys"),
+                          {sort: section(f"{name}.starts.{sort}") for sort in sorts},
+                          {sort: section(f"{name}.rows.{sort}") for sort in sorts})
+
+        def rows(table: str, positions: Sequence[int]) -> _Rows:
+            return _Rows(tables[table], positions)
+
+        def sorted_rows(table: str, sort: str, fields: Sequence[str], positions: Sequence[int]) -> SortedRecords:
+            return SortedRecords(sort, _Keys(tables[table], positions, tables[table].columns(fields)),
+                                 rows(table, positions), len(fields))
+
+        self.cfts = rows("cfts", range(header["tables"]["cfts"]["rows"]))
+        self.sys2 = rows("sys2", range(header["tables"]["sys2"]["rows"]))
+        self.testcases = rows("testcases", range(header["tables"]["testcases"]["rows"]))
+        self.catalog = list(rows("catalog", range(header["tables"]["catalog"]["rows"])))
+
+        by_cfts_id = self.cfts_id_index = index("cfts.by_cfts_id", "cfts")
+        self.cfts_by_cfts_id = _IndexView(by_cfts_id, lambda g: rows("cfts", by_cfts_id.positions(g)))
+        by_req_id = index("cfts.by_req_id", "cfts")
+        self.cfts_by_req_id = _IndexView(by_req_id, lambda g: rows("cfts", by_req_id.positions(g)))
+        by_melco_id = index("cfts.by_melco_id", "cfts")
+        self.cfts_by_melco_id = _IndexView(by_melco_id, lambda g: rows("cfts", by_melco_id.positions(g)))
+        self.cfts_pages = {
+            sort: sorted_rows("cfts", sort, fields, section(f"cfts.order.{sort}"))
+            for sort, fields in CFTS_SORT_KEYS.items()
+        }
+
+        sys2_by_melco_id = index("sys2.by_melco_id", "sys2")
+        self.sys2_by_melco_id = _IndexView(sys2_by_melco_id, lambda g: rows("sys2", sys2_by_melco_id.positions(g)))
+        sys2_by_cfts_id = index("sys2.by_cfts_id", "sys2", tuple(SYS2_SORT_KEYS))
+        self.sys2_pages_by_cfts_id = _IndexView(sys2_by_cfts_id, lambda g: {
+            sort: sorted_rows("sys2", sort, fields, sys2_by_cfts_id.positions(g, sort))
+            for sort, fields in SYS2_SORT_KEYS.items()
+        })
+
+        testcases_by_feature_id = index("testcases.by_feature_id", "testcases")
+        self.testcases_by_feature_id = _IndexView(testcases_by_feature_id, lambda g: sorted_rows(
+            "testcases", "id", TESTCASE_SORT_KEYS["id"], testcases_by_feature_id.positions(g)
+        ))
+
+    def cfts_with_cfts_id_prefix(self, prefix: str) -> list:
+        """CFTS requirements whose CFTS ID starts with prefix (LIKE 'prefix%'), ordered by id."""
+        index = self.cfts_id_index
+        groups = index.prefix_groups(prefix)
+        if len(groups) == 1:
+            return list(_Rows(index.table, index.positions(groups[0])))
+        # Rows are stored in id order, so sorting positions sorts by id
+        return list(_Rows(index.table, sorted(row for group in groups for row in index.positions(group))))
@@ -0,0 +1,167 @@
+"""Per-request SQL statistics, Server-Timing header and repeated-statement (N+1) warnings."""
+import asyncio
+import functools
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .profiling import track_current_thread
+from .tracing import current_span, record_span, span
+
+logger = logging.getLogger(__name__)
+
+# Warn when a request runs the same statement shape more than this many times
+SQL_REPEAT_WARN_THRESHOLD = int(os.getenv("SQL_REPEAT_WARN_THRESHOLD", "10"))
+
+
+class RequestStats:
+    """SQL and timing figures collected for one HTTP request."""
+    __slots__ = ("started", "query_count", "db_time", "statements", "endpoint_finished", "serialize_time")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.endpoint_finished: Optional[float] = None
+        self.serialize_time = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled (None outside a request, e.g. importers)."""
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._request_timing_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = getattr(context, "_request_timing_started", None)
+    if started is not None:
+        stats.db_time += time.perf_counter() - started
+    stats.query_count += 1
+    # The statement text (with placeholders) is the statement's shape
+    stats.statements[statement] += 1
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that records when the endpoint returns.
+
+    Everything after that point in the route handler (response_model
+    validation, jsonable encoding, rendering) is reported as "serialize".
+    In a sampled trace both phases are also recorded as spans.
+    """
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        span_name = f"endpoint {self.name}"
+
+        def mark_finished():
+            stats = _current.get()
+            if stats is not None:
+                stats.endpoint_finished = time.perf_counter()
+
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(*args, **kwargs):
+                try:
+                    with span(span_name):
+                        return await call(*args, **kwargs)
+                finally:
+                    mark_finished()
+        else:
+            @functools.wraps(call)
+            def timed_call(*args, **kwargs):
+                try:
+                    # Runs on a threadpool thread; let an active request profile sample it
+                    with track_current_thread(), span(span_name):
+                        return call(*args, **kwargs)
+                finally:
+                    mark_finished()
+
+        self.dependant.call = timed_call
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            stats = _current.get()
+            if stats is not None and stats.endpoint_finished is not None:
+                stats.serialize_time = time.perf_counter() - stats.endpoint_finished
+                if current_span() is not None:
+                    now = time.time_ns()
+                    record_span("serialize", now - int(stats.serialize_time * 1e9), now)
+            return response
+
+        return timed_handler
+
+
+def _server_timing(stats: RequestStats) -> bytes:
+    total = time.perf_counter() - stats.started
+    return (
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.query_count} queries", '
+        f'serialize;dur={stats.serialize_time * 1000:.2f}, '
+        f'total;dur={total * 1000:.2f}'
+    ).encode("latin-1")
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware attaching RequestStats to each request.
+
+    Adds a Server-Timing header (db, serialize, total up to the response
+    headers) and logs statements repeated more than SQL_REPEAT_WARN_THRESHOLD
+    times once the response has been sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", _server_timing(stats))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self._warn_repeated(scope, stats)
+
+    @staticmethod
+    def _warn_repeated(scope, stats: RequestStats) -> None:
+        for statement, count in stats.statements.items():
+            if count > SQL_REPEAT_WARN_THRESHOLD:
+                route = scope.get("route")
+                logger.warning(
+                    f"Possible N+1: {scope['method']} {route.path if route is not None else scope['path']} "
+                    f"ran the same statement {count} times "
+                    f"({stats.query_count} queries, {stats.db_time * 1000:.1f} ms in DB): "
+                    f"{' '.join(statement.split())[:200]}"
+                )
@@ -0,0 +1,20 @@
+"""Admin token check shared by the admin endpoints and the profiling middleware."""
+import os
+import secrets
+from typing import Optional
+
+# Admin features (request profiling, /admin endpoints) require a matching X-Admin-Token
+# header; they are disabled while no token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def admin_enabled() -> bool:
+    """True when an admin token is configured."""
+    return bool(ADMIN_TOKEN)
+
+
+def admin_token_ok(token: Optional[str]) -> bool:
+    """True when an admin token is configured and the given token matches it."""
+    if not ADMIN_TOKEN:
+        return False
+    return bool(token) and secrets.compare_digest(token, ADMIN_TOKEN)
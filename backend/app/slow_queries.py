@@ -0,0 +1,126 @@
+"""Slow-query recorder with automatic EXPLAIN capture."""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this (ms) are recorded; 0 disables the recorder
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+# Distinct statements kept; the entry with the smallest worst time is evicted first
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "50"))
+# Re-run slow SELECTs under EXPLAIN (ANALYZE, BUFFERS) (PostgreSQL) / EXPLAIN QUERY PLAN (SQLite)
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+
+MAX_PARAMETER_CHARS = 500
+
+_lock = threading.Lock()
+_entries: Dict[str, dict] = {}
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace so the same statement always maps to one entry."""
+    return " ".join(statement.split())
+
+
+def _is_explainable(statement: str) -> bool:
+    return statement.lstrip()[:6].upper() in ("SELECT", "WITH ")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started", None)
+    if started is None or SLOW_QUERY_THRESHOLD_MS <= 0:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms < SLOW_QUERY_THRESHOLD_MS or not context.execution_options.get("slow_query_log", True):
+        return
+    record_slow_query(conn.engine, statement, parameters, elapsed_ms, explain=not executemany)
+
+
+def record_slow_query(engine, statement: str, parameters, elapsed_ms: float, explain: bool = True) -> None:
+    """
+    Add one slow execution to the log.
+
+    When it is the slowest run of its statement so far, the parameters are
+    kept and (for SELECTs) the plan is captured on a background thread.
+    """
+    key = normalize_statement(statement)
+    now = datetime.now(timezone.utc)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            if len(_entries) >= SLOW_QUERY_LOG_SIZE:
+                fastest = min(_entries, key=lambda k: _entries[k]["max_ms"])
+                if _entries[fastest]["max_ms"] >= elapsed_ms:
+                    return
+                del _entries[fastest]
+            entry = _entries[key] = {
+                "statement": key, "count": 0, "max_ms": 0.0, "total_ms": 0.0,
+                "plan": None, "plan_error": None,
+            }
+
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["last_seen"] = now
+        is_worst = elapsed_ms > entry["max_ms"]
+        if is_worst:
+            entry["max_ms"] = elapsed_ms
+            entry["worst_at"] = now
+            entry["worst_parameters"] = repr(parameters)[:MAX_PARAMETER_CHARS]
+
+    logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {key[:200]}")
+
+    if is_worst and explain and SLOW_QUERY_EXPLAIN and _is_explainable(statement):
+        _explain_executor.submit(_capture_plan, engine, key, statement, parameters)
+
+
+def _capture_plan(engine, key: str, statement: str, parameters) -> None:
+    dialect = engine.dialect.name
+    try:
+        with engine.connect() as conn:
+            conn = conn.execution_options(slow_query_log=False)
+            if dialect == "postgresql":
+                rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                plan = [row[0] for row in rows]
+                # ANALYZE executes the statement; never keep its effects
+                conn.rollback()
+            elif dialect == "sqlite":
+                rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                plan = [row[-1] for row in rows]
+            else:
+                return
+        error = None
+    except Exception as e:
+        plan, error = None, str(e)
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None:
+            entry["plan"], entry["plan_error"] = plan, error
+
+
+def get_slow_queries() -> List[dict]:
+    """Recorded statements, slowest first."""
+    with _lock:
+        return sorted((dict(entry) for entry in _entries.values()), key=lambda e: e["max_ms"], reverse=True)
+
+
+def clear_slow_queries() -> None:
+    """Forget all recorded statements."""
+    with _lock:
+        _entries.clear()
@@ -0,0 +1,330 @@
+"""
+Lightweight tracing: spans with W3C trace-context propagation and a batched exporter.
+
+Spans are only created inside a sampled trace; everywhere else a span call
+costs one ContextVar lookup. Finished spans are exported by a background
+thread to a JSON-lines file or to an OTLP/HTTP (JSON) collector.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import re
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Fraction of new traces that are recorded (0 disables tracing); sampled parents are always followed
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+# "file" (JSON lines), "otlp" (OTLP/HTTP JSON) or "none"
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "file")
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(tempfile.gettempdir(), "rtm_traces.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "rtm-backend")
+
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL = 1.0
+MAX_STATEMENT_CHARS = 1000
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    """One timed operation within a trace."""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int = SPAN_KIND_INTERNAL,
+                 start_ns: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, object] = {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        _exporter.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The active span of a sampled trace (None when not tracing)."""
+    return _current.get()
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def start_server_span(name: str, traceparent: Optional[str]) -> Optional[Span]:
+    """
+    Start the root span of an incoming request, continuing the caller's trace.
+
+    A parent with the sampled flag is always followed; otherwise the trace
+    is sampled at TRACE_SAMPLE_RATE. Returns None when not sampled.
+    """
+    match = _TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+    if match and int(match.group(3), 16) & 1:
+        trace_id, parent_id = match.group(1), match.group(2)
+    elif TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE:
+        trace_id, parent_id = (match.group(1) if match else _new_trace_id()), (match.group(2) if match else None)
+    else:
+        return None
+    return Span(name, trace_id, parent_id, SPAN_KIND_SERVER)
+
+
+@contextmanager
+def span(name: str, root: bool = False, **attributes):
+    """
+    Record a child span of the active trace.
+
+    Without an active trace this is a no-op, unless root=True (importer
+    runs, scripts), in which case a new trace is started at TRACE_SAMPLE_RATE.
+    """
+    parent = _current.get()
+    if parent is None:
+        if not (root and TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE):
+            yield None
+            return
+        new_span = Span(name, _new_trace_id(), None)
+    else:
+        new_span = Span(name, parent.trace_id, parent.span_id)
+
+    new_span.attributes.update(attributes)
+    token = _current.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        new_span.end()
+
+
+def traced(name: Optional[str] = None, root: bool = False):
+    """Decorator recording each call of a function as a span (see span())."""
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None and not root:
+                return func(*args, **kwargs)
+            with span(span_name, root=root):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_span(name: str, start_ns: int, end_ns: int, kind: int = SPAN_KIND_INTERNAL, **attributes) -> None:
+    """Record an already finished operation as a child of the active span."""
+    parent = _current.get()
+    if parent is None:
+        return
+    finished = Span(name, parent.trace_id, parent.span_id, kind, start_ns)
+    finished.attributes.update(attributes)
+    finished.end(end_ns)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context._trace_started = time.time_ns()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_trace_started", None)
+    if started is None:
+        return
+    operation = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+    record_span(
+        f"db {operation}", started, time.time_ns(), SPAN_KIND_CLIENT,
+        **{"db.system": conn.engine.dialect.name, "db.statement": " ".join(statement.split())[:MAX_STATEMENT_CHARS]},
+    )
+
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def span_to_otlp(s: Span) -> dict:
+    """Span in the OTLP/JSON encoding (hex IDs, nanosecond timestamps as strings)."""
+    otlp = {
+        "traceId": s.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns),
+        "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+    }
+    if s.parent_id:
+        otlp["parentSpanId"] = s.parent_id
+    return otlp
+
+
+class SpanExporter:
+    """Batches finished spans on a background thread and writes them out."""
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue[Span]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, finished: Span) -> None:
+        if TRACE_EXPORTER == "none":
+            return
+        self._queue.put(finished)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def _drain(self, block: bool) -> list:
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=EXPORT_INTERVAL) if block else self._queue.get_nowait())
+            while len(batch) < EXPORT_BATCH_SIZE:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._export(batch)
+
+    def flush(self) -> None:
+        """Export everything queued so far (called at interpreter exit)."""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._export(batch)
+
+    def _export(self, batch) -> None:
+        spans = [span_to_otlp(s) for s in batch]
+        try:
+            if TRACE_EXPORTER == "otlp":
+                payload = {"resourceSpans": [{
+                    "resource": {"attributes": [
+                        {"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}
+                    ]},
+                    "scopeSpans": [{"scope": {"name": "rtm"}, "spans": spans}],
+                }]}
+                request = urllib.request.Request(
+                    TRACE_OTLP_ENDPOINT, data=json.dumps(payload).encode("utf-8"),
+                    headers={"Content-Type": "application/json"}, method="POST",
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+            else:
+                with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                    for otlp in spans:
+                        otlp["service"] = TRACE_SERVICE_NAME
+                        f.write(json.dumps(otlp, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.warning(f"Dropped {len(batch)} spans: {e}")
+
+
+_exporter = SpanExporter()
+atexit.register(_exporter.flush)
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware opening a server span per sampled request.
+
+    Continues the trace from an incoming ``traceparent`` header, records the
+    X-Forwarded-* client details and returns ``traceparent`` on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {}
+        for name, value in scope["headers"]:
+            if name == b"traceparent" or name.startswith(b"x-forwarded-"):
+                headers[name.decode("latin-1")] = value.decode("latin-1")
+
+        server_span = start_server_span(f"{scope['method']} {scope['path']}", headers.get("traceparent"))
+        if server_span is None:
+            await self.app(scope, receive, send)
+            return
+
+        server_span.attributes.update({
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+        })
+        for header, attribute in (("x-forwarded-for", "client.address"),
+                                  ("x-forwarded-proto", "url.scheme"),
+                                  ("x-forwarded-host", "server.address")):
+            if header in headers:
+                server_span.attributes[attribute] = headers[header].split(",")[0].strip()
+
+        async def send_with_traceparent(message):
+            if message["type"] == "http.response.start":
+                server_span.attributes["http.response.status_code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"traceparent", server_span.traceparent.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = _current.set(server_span)
+        try:
+            await self.app(scope, receive, send_with_traceparent)
+        except BaseException as e:
+            server_span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                server_span.name = f"{scope['method']} {route.path}"
+                server_span.attributes["http.route"] = route.path
+            server_span.end()
@@ -0,0 +1,300 @@
+"""Streaming SYS.2 Excel export built on openpyxl write-only workbooks."""
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from sqlalchemy import select
+
+from .db.crud import ids_filter
+from .models.cfts_db import CFTSRequirementDB
+from .models.sys2_requirement import SYS2RequirementDB
+from .models.testcase import TestCaseDB
+
+
+# Rows fetched per round trip while streaming from the database
+XLSX_EXPORT_BATCH_SIZE = int(os.getenv("XLSX_EXPORT_BATCH_SIZE", "2000"))
+
+SYS2_SHEET_TITLE = "All SYS2 Requirements"
+
+# (標題, 欄位, 欄寬)
+SYS2_EXPORT_COLUMNS = [
+    ("CFTS ID", SYS2RequirementDB.cfts_id, 12),
+    ("CFTS Name", SYS2RequirementDB.cfts_name, 30),
+    ("Melco ID (要件ID)", SYS2RequirementDB.melco_id, 20),
+    ("要件(英語)", SYS2RequirementDB.requirement_en, 50),
+    ("理由(英語)", SYS2RequirementDB.reason_en, 40),
+    ("補足(英語)", SYS2RequirementDB.supplement_en, 40),
+    ("種別", SYS2RequirementDB.type, 15),
+    ("関連要件ID", SYS2RequirementDB.related_requirement_ids, 30),
+    ("(R1L_SR21CFTS)", SYS2RequirementDB.r1l_sr21cfts, 30),
+    ("(R1L_SR22CFTS)", SYS2RequirementDB.r1l_sr22cfts, 30),
+    ("(R1L_SR23CFTS)", SYS2RequirementDB.r1l_sr23cfts, 30),
+    ("(R1L_SR24CFTS)", SYS2RequirementDB.r1l_sr24cfts, 30),
+    ("確認フェーズ", SYS2RequirementDB.confirmation_phase, 15),
+    ("検証基準", SYS2RequirementDB.verification_criteria, 40),
+]
+
+CFTS_EXPORT_COLUMNS = [
+    ("CFTS ID", CFTSRequirementDB.cfts_id, 12),
+    ("CFTS Name", CFTSRequirementDB.cfts_name, 30),
+    ("ReqIF.ForeignID", CFTSRequirementDB.req_id, 15),
+    ("Source Id", CFTSRequirementDB.source_id, 20),
+    ("SR26 Description", CFTSRequirementDB.description, 60),
+    ("SR24 Description", CFTSRequirementDB.sr24_description, 60),
+    ("Melco Id", CFTSRequirementDB.melco_id, 25),
+]
+
+TESTCASE_EXPORT_COLUMNS = [
+    ("Feature-ID", TestCaseDB.feature_id, 20),
+    ("Source", TestCaseDB.source, 15),
+    ("Title", TestCaseDB.title, 30),
+    ("Section", TestCaseDB.section, 15),
+    ("TestItem(EN)", TestCaseDB.test_item_en, 40),
+    ("Precondition/Procedure(JP)", TestCaseDB.precondition_procedure_jp, 50),
+    ("Criteria(JP)", TestCaseDB.criteria_jp, 40),
+    ("MP", TestCaseDB.mp, 8),
+    ("DS", TestCaseDB.ds, 8),
+    ("DT", TestCaseDB.dt, 8),
+    ("HDCC", TestCaseDB.hdcc, 8),
+    ("RU", TestCaseDB.ru, 8),
+    ("Specification", TestCaseDB.specification, 20),
+    ("Priority", TestCaseDB.priority, 10),
+    ("Test Version", TestCaseDB.test_version, 15),
+    ("Test Result", TestCaseDB.test_result, 12),
+    ("Tester", TestCaseDB.tester, 12),
+    ("Issue ID", TestCaseDB.issue_id, 15),
+    ("Note", TestCaseDB.note, 40),
+]
+
+# 跨 CFTS 參考分析使用的欄位 (R1L_SR21CFTS)
+CROSS_REF_COLUMN = 8
+
+# 為不同 CFTS 設定不同的背景顏色
+CFTS_COLORS = {
+    'CFTS004': 'E8F4F8',
+    'CFTS009': 'FFF4E6',
+    'CFTS010': 'E8F5E9',
+    'CFTS011': 'FFF3E0',
+    'CFTS012': 'F3E5F5',
+    'CFTS014': 'E1F5FE',
+    'CFTS015': 'FFF9C4',
+    'CFTS016': 'FCE4EC',
+    'CFTS019': 'E0F2F1',
+    'CFTS020': 'F1F8E9',
+    'CFTS021': 'E3F2FD',
+    'CFTS022': 'FBE9E7',
+    'CFTS025': 'F9FBE7',
+    'CFTS026': 'FFE0B2',
+    'CFTS032': 'F8BBD0',
+    'CFTS041': 'DCEDC8',
+    'CFTS042': 'FFCCBC',
+    'CFTS044': 'CFD8DC',
+}
+
+# 預設顏色（淺灰）
+DEFAULT_CFTS_COLOR = 'F5F5F5'
+
+HEADER_STYLE = "sys2_header"
+
+# Data style colours in registration order
+DATA_STYLE_COLORS = sorted(set(CFTS_COLORS.values()) | {DEFAULT_CFTS_COLOR})
+
+
+def _data_style_name(color: str) -> str:
+    return f"sys2_data_{color}"
+
+
+def register_sys2_styles(workbook: Workbook) -> None:
+    """Create the header style and one data style per CFTS colour (once per workbook)."""
+    header = NamedStyle(name=HEADER_STYLE)
+    header.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    header.font = Font(color='FFFFFF', bold=True, size=11)
+    header.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header.border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                           top=Side(style='thin'), bottom=Side(style='thin'))
+    workbook.add_named_style(header)
+
+    thin = Side(style='thin', color='CCCCCC')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    alignment = Alignment(vertical='top', wrap_text=True)
+    for color in DATA_STYLE_COLORS:
+        style = NamedStyle(name=_data_style_name(color))
+        style.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+        style.border = border
+        style.alignment = alignment
+        workbook.add_named_style(style)
+
+
+def iter_column_batches(db, columns, criteria=(), order_by=()) -> Iterator[list]:
+    """Yield batches of rows (in the order of an export column spec) from a server-side cursor."""
+    stmt = select(*(column for _, column, _ in columns)).where(*criteria).order_by(*order_by)
+    for partition in db.execute(stmt.execution_options(yield_per=XLSX_EXPORT_BATCH_SIZE)).partitions():
+        yield partition
+
+
+def iter_sys2_export_batches(db, cfts_ids: Optional[List[str]] = None) -> Iterator[list]:
+    """Yield batches of SYS.2 export rows (column order of SYS2_EXPORT_COLUMNS) from a server-side cursor."""
+    criteria = [ids_filter(db, SYS2RequirementDB.cfts_id, cfts_ids)] if cfts_ids else []
+    return iter_column_batches(
+        db, SYS2_EXPORT_COLUMNS, criteria, (SYS2RequirementDB.cfts_id, SYS2RequirementDB.melco_id)
+    )
+
+
+def count_cross_cfts_refs(cfts_ids, sr21_values) -> int:
+    """
+    Count CFTS references in R1L_SR21CFTS that point at a different CFTS than the row's own.
+
+    Vectorised over a batch: every ``CFTS<digits>`` occurrence is extracted at
+    once and compared against the owning row's CFTS ID.
+    """
+    # pandas 只有匯出時才需要，延後載入以縮短 API worker 啟動時間
+    import pandas as pd
+
+    refs = pd.Series(sr21_values, dtype=object).astype(str).str.extractall(r'(CFTS\d+)')
+    if refs.empty:
+        return 0
+    owners = pd.Series(cfts_ids, dtype=object).to_numpy()[refs.index.get_level_values(0)]
+    return int((refs[0].to_numpy() != owners).sum())
+
+
+# Cell style indices of the export styles (same in every workbook, see start_sheet())
+_export_style_ids: Optional[Tuple[int, ...]] = None
+
+
+def _register_cell_style(worksheet, name: str) -> int:
+    """
+    Add the cell format of a named style to the workbook and return its index.
+
+    openpyxl only adds a cell's format to the workbook's cellXfs table when
+    its ``style_id`` is first read (normally while the cell is written), so
+    reading it here is what registers the format.
+    """
+    cell = WriteOnlyCell(worksheet)
+    cell.style = name
+    return cell.style_id
+
+
+def start_sheet(workbook: Workbook, title: str, columns):
+    """
+    Create a write-only sheet with column widths, frozen panes and the header row.
+
+    Every export style is resolved up front in a fixed order, so the style
+    indices in the sheet XML are identical across workbooks built by this
+    module (assemble_workbook() relies on this to merge sheets); a change in
+    those indices raises RuntimeError instead of producing a broken file.
+    """
+    worksheet = workbook.create_sheet(title)
+    style_ids = tuple(
+        _register_cell_style(worksheet, name)
+        for name in [HEADER_STYLE] + [_data_style_name(color) for color in DATA_STYLE_COLORS]
+    )
+    global _export_style_ids
+    if _export_style_ids is None:
+        _export_style_ids = style_ids
+    elif style_ids != _export_style_ids:
+        raise RuntimeError(f"Export style indices changed ({style_ids} != {_export_style_ids})")
+
+    for col_idx, (_, _, width) in enumerate(columns, start=1):
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+
+    # 凍結首列和前三欄（SYS.2: CFTS ID, CFTS Name, Melco ID）
+    worksheet.freeze_panes = 'D2'
+
+    header = []
+    for name, _, _ in columns:
+        cell = WriteOnlyCell(worksheet, value=name)
+        cell.style = HEADER_STYLE
+        header.append(cell)
+    worksheet.append(header)
+    return worksheet
+
+
+def _styled_cells(worksheet, color: str, column_count: int) -> list:
+    cells = []
+    for _ in range(column_count):
+        cell = WriteOnlyCell(worksheet)
+        cell.style = _data_style_name(color)
+        cells.append(cell)
+    return cells
+
+
+def finish_sheet(worksheet, columns, row_count: int) -> None:
+    """Enable the auto-filter over the header and the written rows."""
+    # 啟用自動篩選
+    last_column = get_column_letter(len(columns))
+    worksheet.auto_filter.ref = f"A1:{last_column}{row_count + 1}"
+
+
+def write_sys2_sheet(workbook: Workbook, title: str, batches) -> Tuple[int, Dict[str, int], int]:
+    """
+    Append a styled SYS.2 sheet to a write-only workbook, row by row.
+
+    Args:
+        workbook: Write-only workbook with register_sys2_styles() applied
+        title: Sheet title
+        batches: Iterable of row batches from iter_sys2_export_batches()
+
+    Returns:
+        (row count, rows per CFTS ID, cross-CFTS reference count)
+    """
+    worksheet = start_sheet(workbook, title, SYS2_EXPORT_COLUMNS)
+
+    # Write-only rows are serialised on append, so one styled cell per
+    # column and colour can be reused for every row
+    cells_by_color = {}
+    row_count = 0
+    cfts_stats: Dict[str, int] = {}
+    cross_ref_count = 0
+
+    for rows in batches:
+        for row in rows:
+            cfts_id = row[0]
+            color = CFTS_COLORS.get(cfts_id, DEFAULT_CFTS_COLOR)
+            cells = cells_by_color.get(color)
+            if cells is None:
+                cells = cells_by_color[color] = _styled_cells(worksheet, color, len(SYS2_EXPORT_COLUMNS))
+
+            for cell, value in zip(cells, row):
+                cell.value = value
+            worksheet.append(cells)
+            cfts_stats[cfts_id] = cfts_stats.get(cfts_id, 0) + 1
+
+        row_count += len(rows)
+        cross_ref_count += count_cross_cfts_refs(
+            [row[0] for row in rows], [row[CROSS_REF_COLUMN] for row in rows]
+        )
+
+    finish_sheet(worksheet, SYS2_EXPORT_COLUMNS, row_count)
+    return row_count, cfts_stats, cross_ref_count
+
+
+def write_table_sheet(workbook: Workbook, title: str, columns, batches, color: str) -> int:
+    """
+    Append a sheet whose rows all share one CFTS colour (per-CFTS exports).
+
+    Returns:
+        Number of data rows written
+    """
+    worksheet = start_sheet(workbook, title, columns)
+    cells = _styled_cells(worksheet, color, len(columns))
+    row_count = 0
+
+    for rows in batches:
+        for row in rows:
+            for cell, value in zip(cells, row):
+                cell.value = value
+            worksheet.append(cells)
+        row_count += len(rows)
+
+    finish_sheet(worksheet, columns, row_count)
+    return row_count
+
+
+def new_sys2_workbook() -> Workbook:
+    """Create a write-only workbook with the SYS.2 export styles registered."""
+    workbook = Workbook(write_only=True)
+    register_sys2_styles(workbook)
+    return workbook
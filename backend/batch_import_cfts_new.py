@@ -9,9 +9,12 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple
 
-from app.db.database import engine, SessionLocal, Base
+from app.tracing import traced
+from importer_utils import run_post_import_steps
+from app.db.database import SessionLocal
 from app.models.requirement import CFTSRequirement
-from app.models.cfts_db import CFTSRequirementDB
+from app.models.cfts_db import CFTSRequirementDB, CFTSCatalogDB
+from app.db.crud import sync_melco_links
 
 
 class CFTSImporter:
@@ -34,6 +37,8 @@ class CFTSImporter:
             'skipped_records': 0,
             'errors': []
         }
+        # CFTS ID -> imported file name (recorded in cfts_catalog)
+        self.source_files = {}
 
     def find_excel_files(self) -> List[Path]:
         """Find all CFTS Excel files in the folder."""
@@ -65,6 +70,7 @@ class CFTSImporter:
 
         return cfts_id, cfts_name
 
+    @traced("import.cfts.parse_excel_file")
     def parse_excel_file(self, file_path: Path) -> Tuple[List[Dict], int]:
         """
         Parse a single CFTS Excel file.
@@ -124,6 +130,7 @@ class CFTSImporter:
         except Exception as e:
             raise Exception(f"Error parsing {file_path.name}: {str(e)}")
 
+    @traced("import.cfts.import_to_database")
     def import_to_database(self, data: List[Dict]) -> int:
         """
         Import data to database.
@@ -149,12 +156,17 @@ class CFTSImporter:
                         # Update existing record
                         for key, value in item.items():
                             setattr(existing, key, value)
+                        db_record = existing
                     else:
                         # Insert new record
                         db_record = CFTSRequirementDB(**item)
                         db.add(db_record)
+                        db.flush()
                         inserted_count += 1
 
+                    # Keep the normalized Melco ID links in sync with this row
+                    sync_melco_links(db, db_record.id, item['melco_id'])
+
                     db.commit()
 
                 except Exception as e:
@@ -167,11 +179,9 @@ class CFTSImporter:
         finally:
             db.close()
 
+    @traced("import.cfts", root=True)
     def process_all_files(self) -> Dict:
         """Process all CFTS Excel files in the folder."""
-        # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
-
         # Find all Excel files
         excel_files = self.find_excel_files()
         self.report['total_files'] = len(excel_files)
@@ -200,6 +210,7 @@ class CFTSImporter:
                 print(f"  Inserted: {inserted_count}")
 
                 # Update report
+                self.source_files[cfts_id] = file_path.name
                 self.report['success_files'].append(file_path.name)
                 self.report['total_records'] += total_count
                 self.report['inserted_records'] += inserted_count
@@ -214,6 +225,8 @@ class CFTSImporter:
                     'error': error_msg
                 })
 
+        run_post_import_steps('cfts', self.source_files)
+
         return self.report
 
     def print_summary(self):
@@ -228,11 +241,15 @@ class CFTSImporter:
         print(f"Successfully inserted: {self.report['inserted_records']}")
         print(f"Skipped (duplicates/updates): {self.report['skipped_records']}")
 
-        # Verify database
+        # Verify database (per-CFTS counts come from the maintained catalog)
         db = SessionLocal()
         try:
-            total_in_db = db.query(CFTSRequirementDB).count()
+            catalog = db.query(CFTSCatalogDB).order_by(CFTSCatalogDB.cfts_id).all()
+            total_in_db = sum(entry.requirement_count for entry in catalog)
             print(f"\nTotal CFTS records in database: {total_in_db}")
+            for entry in catalog:
+                print(f"  {entry.cfts_id} {entry.cfts_name}: {entry.requirement_count} requirements, "
+                      f"{entry.sys2_count} SYS.2, {entry.testcase_count} test cases")
 
             # Show sample with Melco ID
             sample = db.query(CFTSRequirementDB).filter(
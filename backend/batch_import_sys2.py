@@ -9,7 +9,9 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Tuple
 
-from app.db.database import engine, SessionLocal, Base
+from app.tracing import traced
+from importer_utils import run_post_import_steps
+from app.db.database import SessionLocal
 from app.models.sys2_requirement import SYS2RequirementDB, SYS2Requirement
 
 
@@ -31,6 +33,7 @@ class SYS2Importer:
             'errors': []
         }
 
+    @traced("import.sys2.parse_excel_file")
     def parse_excel_file(self) -> List[Dict]:
         """
         Parse R1L_SYS.2.xlsx file.
@@ -81,6 +84,7 @@ class SYS2Importer:
         except Exception as e:
             raise Exception(f"Error parsing {self.excel_file.name}: {str(e)}")
 
+    @traced("import.sys2.import_to_database")
     def import_to_database(self, data: List[Dict]) -> int:
         """
         Import data to database.
@@ -124,11 +128,9 @@ class SYS2Importer:
         finally:
             db.close()
 
+    @traced("import.sys2", root=True)
     def process_file(self) -> Dict:
         """Process R1L_SYS.2.xlsx file."""
-        # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
-
         print(f"Processing: {self.excel_file.name}")
         print("-" * 80)
 
@@ -154,6 +156,8 @@ class SYS2Importer:
                 'error': error_msg
             })
 
+        run_post_import_steps('sys2')
+
         return self.report
 
     def print_summary(self):
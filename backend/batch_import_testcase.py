@@ -8,7 +8,9 @@ from pathlib import Path
 from datetime import datetime
 from typing import List, Dict
 
-from app.db.database import engine, SessionLocal, Base
+from app.tracing import traced
+from importer_utils import run_post_import_steps
+from app.db.database import SessionLocal
 from app.models.testcase import TestCaseDB, TestCase
 
 
@@ -30,6 +32,7 @@ class TestCaseImporter:
             'errors': []
         }
 
+    @traced("import.testcase.parse_excel_file")
     def parse_excel_file(self) -> List[Dict]:
         """
         Parse R1L_TestCase.xlsx file.
@@ -84,6 +87,7 @@ class TestCaseImporter:
         except Exception as e:
             raise Exception(f"Error parsing {self.excel_file.name}: {str(e)}")
 
+    @traced("import.testcase.import_to_database")
     def import_to_database(self, data: List[Dict]) -> int:
         """
         Import data to database.
@@ -120,11 +124,9 @@ class TestCaseImporter:
         finally:
             db.close()
 
+    @traced("import.testcase", root=True)
     def process_file(self) -> Dict:
         """Process R1L_TestCase.xlsx file."""
-        # Ensure database tables exist
-        Base.metadata.create_all(bind=engine)
-
         print(f"Processing: {self.excel_file.name}")
         print("-" * 80)
 
@@ -149,6 +151,8 @@ class TestCaseImporter:
                 'error': error_msg
             })
 
+        run_post_import_steps('testcase')
+
         return self.report
 
     def print_summary(self):
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming SYS2 Excel export (time and peak memory).
+
+Generates synthetic SYS.2 requirements in a throwaway SQLite database and
+exports them with the same engine as export_sys2_merged.py.
+
+Usage:
+    python benchmark_export_sys2.py [rows]      # default: 100000
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# 使用暫存資料庫，不影響實際資料
+_workdir = tempfile.mkdtemp(prefix="sys2_export_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/bench.db"
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import insert
+from app.db.database import SessionLocal, engine
+from app.models.sys2_requirement import SYS2RequirementDB
+from app.xlsx_export import (
+    CFTS_COLORS,
+    SYS2_SHEET_TITLE,
+    iter_sys2_export_batches,
+    new_sys2_workbook,
+    write_sys2_sheet,
+)
+
+
+def seed_rows(row_count: int, batch_size: int = 5000):
+    """Insert synthetic SYS.2 rows spread across the known CFTS IDs."""
+    SYS2RequirementDB.__table__.create(bind=engine)
+    cfts_ids = sorted(CFTS_COLORS)
+    rng = random.Random(0)
+
+    with engine.begin() as conn:
+        for start in range(0, row_count, batch_size):
+            batch = []
+            for i in range(start, min(start + batch_size, row_count)):
+                cfts_id = cfts_ids[i % len(cfts_ids)]
+                ref = rng.choice(cfts_ids)
+                batch.append({
+                    "melco_id": f"PS{cfts_id}-{i // len(cfts_ids)}-1",
+                    "cfts_id": cfts_id,
+                    "cfts_name": f"{cfts_id} Feature",
+                    "requirement_en": f"The system shall handle requirement {i}. " * 4,
+                    "reason_en": f"Reason for requirement {i}.",
+                    "supplement_en": "",
+                    "type": "Function",
+                    "related_requirement_ids": f"PS{ref}-{i % 97}-1",
+                    "r1l_sr21cfts": f"{ref}-{i % 900}\n{cfts_id}-{i % 500}",
+                    "r1l_sr22cfts": f"{ref}-{i % 900}",
+                    "r1l_sr23cfts": "",
+                    "r1l_sr24cfts": "",
+                    "confirmation_phase": "SYS.5",
+                    "verification_criteria": f"要件 {i} が満たされること",
+                })
+            conn.execute(insert(SYS2RequirementDB.__table__), batch)
+
+
+def run_export(output_path: Path):
+    db = SessionLocal()
+    try:
+        workbook = new_sys2_workbook()
+        result = write_sys2_sheet(workbook, SYS2_SHEET_TITLE, iter_sys2_export_batches(db))
+        workbook.save(output_path)
+        return result
+    finally:
+        db.close()
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    output_path = Path(_workdir) / "bench.xlsx"
+
+    print(f"建立 {row_count} 筆測試資料: {_workdir}")
+    seed_rows(row_count)
+
+    started = time.perf_counter()
+    exported, cfts_stats, cross_refs = run_export(output_path)
+    elapsed = time.perf_counter() - started
+
+    # 第二次執行只量測記憶體（tracemalloc 會拖慢速度）
+    tracemalloc.start()
+    run_export(output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"匯出筆數:     {exported} ({len(cfts_stats)} CFTS, {cross_refs} 跨 CFTS 參考)")
+    print(f"匯出時間:     {elapsed:.2f} 秒 ({exported / elapsed:,.0f} 筆/秒)")
+    print(f"Python 峰值記憶體: {peak / 1024 / 1024:.1f} MB")
+    print(f"檔案大小:     {output_path.stat().st_size / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
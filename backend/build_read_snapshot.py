@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Publish the read model snapshot (READ_MODEL_SNAPSHOT) from the current database contents."""
+import sys
+
+from app.db.database import SessionLocal
+from app.read_model import READ_MODEL_SNAPSHOT
+from app.read_snapshot import build_snapshot
+
+
+def main():
+    """Write the snapshot the API workers map (e.g. once at deploy, before the first import)."""
+    path = sys.argv[1] if len(sys.argv) > 1 else READ_MODEL_SNAPSHOT
+    if not path:
+        print("Usage: build_read_snapshot.py [path]  (or set READ_MODEL_SNAPSHOT)")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        version = build_snapshot(db, path)
+        print(f"Read model snapshot written to {path} (data version {version})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
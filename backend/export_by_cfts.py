@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Export CFTS requirements, SYS2 requirements and test cases partitioned by CFTS.
+
+Usage:
+    python export_by_cfts.py <output.zip>  [CFTS016 CFTS021 ...]   # one workbook per CFTS
+    python export_by_cfts.py <output.xlsx> [CFTS016 CFTS021 ...]   # one workbook, sheets per CFTS
+
+Partitions are rendered in parallel; EXPORT_PROCESSES sets the number of
+worker processes (default: CPU count).
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add app directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.partitioned_export import export_by_cfts
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    output_path = Path(sys.argv[1])
+    mode = "sheets" if output_path.suffix.lower() == ".xlsx" else "zip"
+    cfts_ids = sys.argv[2:] or None
+    processes = int(os.getenv("EXPORT_PROCESSES", "0")) or None
+
+    print("=" * 80)
+    print(f"依 CFTS 分割匯出 ({'單一活頁簿，每個 CFTS 一組工作表' if mode == 'sheets' else '每個 CFTS 一個活頁簿 (zip)'})")
+    print("=" * 80)
+
+    started = time.perf_counter()
+    counts = export_by_cfts(output_path, mode, cfts_ids, processes)
+
+    if not counts:
+        print("❌ 沒有可匯出的 CFTS")
+        sys.exit(1)
+
+    print(f"\n{'CFTS ID':<12} {'CFTS':>8} {'SYS.2':>8} {'TestCase':>10}")
+    for cfts_id, datasets in counts.items():
+        print(f"{cfts_id:<12} {datasets['cfts']:>8} {datasets['sys2']:>8} {datasets['testcases']:>10}")
+
+    print(f"\n✅ 匯出 {len(counts)} 個 CFTS 到: {output_path} ({time.perf_counter() - started:.1f} 秒)")
+    print(f"檔案大小: {output_path.stat().st_size / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
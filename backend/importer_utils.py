@@ -0,0 +1,65 @@
+"""Steps shared by the batch importers after their rows are written."""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.tracing import span
+from app.db.database import SessionLocal
+from app.db.data_version import bump_data_version
+from app.db.crud import refresh_cfts_catalog
+from app.db.search import NGRAM_SOURCES, refresh_search_index, refresh_ngram_index
+from app.read_model import READ_MODEL_SNAPSHOT
+from app.read_snapshot import build_snapshot
+
+
+def publish_data_version(db: Session) -> int:
+    """
+    Bump the data version so the API drops its caches and re-checks the read
+    replica and read model. Importers and rebuild scripts call this last.
+    """
+    version = bump_data_version(db)
+    print(f"  Data version: {version}")
+    return version
+
+
+def run_post_import_steps(table: str, source_files: Optional[Dict[str, str]] = None) -> None:
+    """
+    Refresh the derived data of an imported table and publish the new data version.
+
+    Runs, each in its own session and span ``import.<table>.<step>``: the
+    search index (plus the n-gram index for Japanese text tables), the CFTS
+    catalog, the data version bump and, when READ_MODEL_SNAPSHOT is set, the
+    read model snapshot. A failing step is reported and the next one still runs.
+
+    Args:
+        table: Imported table as a search doc type ('cfts', 'sys2' or 'testcase')
+        source_files: CFTS ID -> source file name, recorded in the catalog (CFTS import)
+    """
+    def search_index(db: Session):
+        print(f"  Search index refreshed: {refresh_search_index(db, table)} documents")
+        if table in NGRAM_SOURCES:
+            print(f"  Japanese n-gram index refreshed: {refresh_ngram_index(db, table)} postings")
+
+    def catalog(db: Session):
+        print(f"  CFTS catalog refreshed: {refresh_cfts_catalog(db, source_files)} CFTS")
+
+    def read_snapshot(db: Session):
+        print(f"  Read model snapshot published: data version {build_snapshot(db, READ_MODEL_SNAPSHOT)}")
+
+    steps: List[Tuple[str, str, Callable[[Session], None]]] = [
+        ("refresh_search_index", "Search index refresh", search_index),
+        ("refresh_cfts_catalog", "CFTS catalog refresh", catalog),
+        ("publish_data_version", "Data version bump", publish_data_version),
+    ]
+    if READ_MODEL_SNAPSHOT:
+        steps.append(("publish_read_snapshot", "Read model snapshot publish", read_snapshot))
+
+    for name, label, step in steps:
+        with span(f"import.{table}.{name}"):
+            db = SessionLocal()
+            try:
+                step(db)
+            except Exception as e:
+                print(f"  {label} failed: {str(e)}")
+            finally:
+                db.close()
@@ -4,7 +4,7 @@ import json
 import sys
 import os
 
-from app.db.database import engine, SessionLocal, Base
+from app.db.database import SessionLocal
 from app.db.crud import bulk_create_cfts_requirements
 from app.models.requirement import CFTSRequirement
 from app.models.cfts_db import CFTSRequirementDB
@@ -13,10 +13,6 @@ from app.models.cfts_db import CFTSRequirementDB
 def load_data_to_database():
     """Load extracted Excel data into database."""
     try:
-        # Create tables
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully")
-        
         # Load JSON data (check multiple possible paths)
         possible_paths = [
             "/app/extracted_data_md_scope.json",  # Docker path (MD Scope filtered)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Rebuild the cfts_catalog table from the CFTS, SYS.2 and TestCase tables."""
+from app.db.database import SessionLocal
+from importer_utils import publish_data_version
+from app.db.crud import refresh_cfts_catalog, get_cfts_catalog
+
+
+def main():
+    """Recompute every catalog entry (the table comes from `alembic upgrade head`)."""
+    db = SessionLocal()
+    try:
+        print("Rebuilding cfts_catalog...")
+        refresh_cfts_catalog(db)
+        for entry in get_cfts_catalog(db):
+            print(f"  {entry.cfts_id} {entry.cfts_name}: {entry.requirement_count} requirements, "
+                  f"{entry.sys2_count} SYS.2, {entry.testcase_count} test cases")
+
+        publish_data_version(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
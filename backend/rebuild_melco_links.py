@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Rebuild the normalized CFTS ↔ Melco ID link table from cfts_requirements."""
+from app.db.database import SessionLocal
+from importer_utils import publish_data_version
+from app.db.crud import rebuild_melco_links
+from app.models.cfts_db import CFTSRequirementDB
+
+
+def main():
+    """Repopulate the link table (the table comes from `alembic upgrade head`)."""
+    db = SessionLocal()
+    try:
+        print("Rebuilding cfts_melco_links...")
+        link_count = rebuild_melco_links(db)
+        requirement_count = db.query(CFTSRequirementDB).count()
+        print(f"Linked {requirement_count} CFTS requirements to {link_count} Melco IDs")
+
+        publish_data_version(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
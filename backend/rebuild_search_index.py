@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Rebuild the full-text search and Japanese n-gram indexes from the CFTS, SYS.2 and TestCase tables."""
+from app.db.database import SessionLocal
+from importer_utils import publish_data_version
+from app.db.search import refresh_all_search_indexes, refresh_all_ngram_indexes
+
+
+def main():
+    """Repopulate the search indexes (the tables come from `alembic upgrade head`)."""
+    db = SessionLocal()
+    try:
+        print("Rebuilding search_documents...")
+        for doc_type, indexed in refresh_all_search_indexes(db).items():
+            print(f"  {doc_type}: {indexed} documents")
+
+        print("Rebuilding ngram_postings...")
+        for doc_type, postings in refresh_all_ngram_indexes(db).items():
+            print(f"  {doc_type}: {postings} postings")
+
+        publish_data_version(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()